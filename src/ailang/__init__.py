@@ -20,6 +20,7 @@ Example:
     result = ai.run('summarize {text} !brief', text="Long article...")
 """
 
+from ailang.breaker import CircuitOpenError, CircuitPolicy
 from ailang.contracts import (
     ContractError,
     ContractResult,
@@ -34,9 +35,22 @@ from ailang.contracts import (
     str_,
 )
 from ailang.core import AILANG
+from ailang.deadline import DeadlineExceededError
 from ailang.parser import parse
 from ailang.providers import get_provider
+from ailang.replay import ReplayPolicy
+from ailang.retry import RetryPolicy
+from ailang.routing import (
+    CascadePolicy,
+    CascadeProvider,
+    HedgedProvider,
+    HedgePolicy,
+    Route,
+    RouterProvider,
+)
+from ailang.tokens import PromptTooLongError
 from ailang.transpiler import to_ailang, transpile
+from ailang.usage import ModelPrice
 
 __version__ = "0.1.0"
 __all__ = [
@@ -48,6 +62,19 @@ __all__ = [
     "to_ailang",
     # Providers
     "get_provider",
+    "RetryPolicy",
+    "DeadlineExceededError",
+    "CircuitPolicy",
+    "CircuitOpenError",
+    "ModelPrice",
+    "PromptTooLongError",
+    "ReplayPolicy",
+    "HedgedProvider",
+    "HedgePolicy",
+    "RouterProvider",
+    "Route",
+    "CascadeProvider",
+    "CascadePolicy",
     # Contract types
     "str_",
     "int_",
@@ -0,0 +1,119 @@
+"""
+AILANG Batch - Bounded-concurrency execution over many inputs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Sized
+from dataclasses import dataclass
+from typing import Any
+
+ProgressCallback = Callable[[int, "int | None"], None]
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one item in a batch: either a result or the error it raised."""
+
+    index: int
+    input: Any
+    result: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """Return the result, re-raising the item's error if it failed."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def bounded_map(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    concurrency: int = 8,
+    ordered: bool = True,
+    progress: ProgressCallback | None = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Apply ``fn`` to every item with at most ``concurrency`` calls in flight.
+
+    Items are pulled from ``items`` lazily, so arbitrarily large iterables can
+    be processed in constant memory. A failing item produces a BatchResult
+    carrying its error instead of aborting the batch.
+
+    Args:
+        fn: Async function to apply to each item
+        items: Inputs to process
+        concurrency: Maximum number of concurrent calls
+        ordered: Yield results in input order (True) or as they complete (False)
+        progress: Called with (completed, total) after each item; total is None
+            when the iterable has no length
+
+    Yields:
+        BatchResult for each item
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    total = len(items) if isinstance(items, Sized) else None
+    source = enumerate(items)
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = 0
+
+    async def run(index: int, item: Any) -> BatchResult:
+        async with semaphore:
+            try:
+                return BatchResult(index, item, result=await fn(item))
+            except Exception as e:
+                return BatchResult(index, item, error=e)
+
+    def submit() -> asyncio.Task | None:
+        try:
+            index, item = next(source)
+        except StopIteration:
+            return None
+        return asyncio.ensure_future(run(index, item))
+
+    def report() -> None:
+        nonlocal completed
+        completed += 1
+        if progress is not None:
+            progress(completed, total)
+
+    # In ordered mode, keep a window of queued tasks larger than the
+    # concurrency so a slow head item doesn't leave the other slots idle
+    window = concurrency * 2 if ordered else concurrency
+    queue: deque[asyncio.Task] = deque()
+    try:
+        while len(queue) < window and (task := submit()) is not None:
+            queue.append(task)
+
+        while queue:
+            if ordered:
+                result = await queue.popleft()
+            else:
+                done, _ = await asyncio.wait(queue, return_when=asyncio.FIRST_COMPLETED)
+                finished = done.pop()
+                queue.remove(finished)
+                result = finished.result()
+
+            report()
+            if (task := submit()) is not None:
+                queue.append(task)
+            yield result
+    finally:
+        for task in queue:
+            task.cancel()
+
+
+async def collect(results: AsyncIterator[BatchResult]) -> list[BatchResult]:
+    """Gather a batch's results into a list ordered by input index."""
+    collected = [result async for result in results]
+    collected.sort(key=lambda result: result.index)
+    return collected
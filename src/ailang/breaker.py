@@ -0,0 +1,153 @@
+"""
+AILANG Circuit Breaker - Fail fast while a provider endpoint is down.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from ailang.deadline import DeadlineExceededError
+from ailang.retry import is_connection_error, status_code
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+    pass
+
+
+@dataclass
+class CircuitPolicy:
+    """
+    When a provider endpoint's circuit opens, and what happens while it is open.
+
+    The circuit opens once at least ``min_calls`` of the last ``window`` calls
+    have been seen and ``failure_rate`` of them failed. After ``open_for``
+    seconds it lets ``probes`` calls through (half-open): a successful probe
+    closes the circuit, a failed one opens it again. While open, calls go to
+    ``fallback`` if set, otherwise they raise CircuitOpenError immediately.
+
+    Example:
+        policy = CircuitPolicy(failure_rate=0.5, open_for=30.0, fallback=backup)
+        ai = AILANG(provider="ollama", base_url=box, circuit_breaker=policy)
+    """
+
+    failure_rate: float = 0.5
+    min_calls: int = 10
+    window: int = 20
+    open_for: float = 30.0
+    probes: int = 1
+    fallback: Any = None
+
+    def is_failure(self, error: BaseException) -> bool:
+        """
+        Whether an error means the endpoint is unhealthy.
+
+        Server errors, connection failures and timeouts count; bad requests
+        and the caller's own deadline running out don't.
+        """
+        status = status_code(error)
+        if status is not None:
+            return status >= 500
+        if isinstance(error, TimeoutError):
+            return not isinstance(error, DeadlineExceededError)
+        return is_connection_error(error)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open state for one endpoint.
+
+    Example:
+        breaker = CircuitBreaker(CircuitPolicy())
+        if breaker.allow():
+            ...
+            breaker.record(failed=False)
+    """
+
+    def __init__(self, policy: CircuitPolicy):
+        self.policy = policy
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; half-open admits a few probes."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.policy.open_for:
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.policy.probes:
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of an allowed call."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (
+                len(self._outcomes) >= self.policy.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.policy.failure_rate
+            ):
+                self._open()
+
+    def release(self) -> None:
+        """Forget an allowed call that ended without an outcome (cancelled, or a caller error)."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+# Process-wide breakers, shared by every provider instance using the endpoint
+_BREAKERS: dict[tuple[str, str], CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(provider: str, endpoint: str, policy: CircuitPolicy) -> CircuitBreaker:
+    """
+    Get the shared circuit breaker for a provider endpoint.
+
+    The most recently requested policy applies to every user of the breaker.
+
+    Args:
+        provider: Provider name
+        endpoint: Base URL of the endpoint ("" for the provider's default)
+        policy: Thresholds and fallback
+
+    Returns:
+        CircuitBreaker shared across the process
+    """
+    key = (provider, endpoint)
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(key)
+        if breaker is None:
+            breaker = _BREAKERS[key] = CircuitBreaker(policy)
+        else:
+            breaker.policy = policy
+        return breaker
@@ -2,6 +2,8 @@
 AILANG CLI - Command line interface.
 """
 
+import asyncio
+import json
 import sys
 
 import click
@@ -15,7 +17,22 @@ from ailang.transpiler import to_ailang, transpile
 console = Console()
 
 
-@click.group(invoke_without_command=True)
+class _MainGroup(click.Group):
+    """Group whose optional COMMAND argument doesn't swallow subcommand names."""
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or args[0] not in self.commands:
+            return super().parse_args(ctx, args)
+        # "ailang serve ..." runs the serve subcommand, not an AILANG command
+        params = self.params
+        self.params = [param for param in params if param.name != "command"]
+        try:
+            return super().parse_args(ctx, args)
+        finally:
+            self.params = params
+
+
+@click.group(cls=_MainGroup, invoke_without_command=True)
 @click.argument("command", required=False)
 @click.option("--provider", "-p", default="openai", help="AI provider (openai, anthropic, ollama)")
 @click.option("--model", "-m", help="Model name")
@@ -23,16 +40,18 @@ console = Console()
 @click.option("--transpile-only", "-t", is_flag=True, help="Show prompt without executing")
 @click.option("--interactive", "-i", is_flag=True, help="Interactive mode")
 @click.option("--parse-only", is_flag=True, help="Show parsed AST")
+@click.option("--stream", "-s", is_flag=True, help="Stream the response as it is generated")
 @click.pass_context
 def main(
     ctx: click.Context,
-    command: str | None,
     provider: str,
     model: str | None,
     api_key: str | None,
     transpile_only: bool,
     interactive: bool,
     parse_only: bool,
+    stream: bool,
+    command: str | None = None,
 ):
     """
     AILANG - A structured language for human-AI communication.
@@ -43,6 +62,8 @@ def main(
 
         ailang 'code "fibonacci" [python] !typed' --transpile-only
 
+        ailang --stream 'write "short story"'
+
         ailang --interactive
 
         ailang serve --port 8000
@@ -83,13 +104,23 @@ def main(
     # Execute command
     try:
         ai = AILANG(provider=provider, model=model, api_key=api_key)
-        result = ai.run(command)
-        console.print(result)
+        if stream:
+            asyncio.run(_stream_command(ai, command))
+        else:
+            result = ai.run(command)
+            console.print(result)
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         sys.exit(1)
 
 
+async def _stream_command(ai: AILANG, command: str):
+    """Print a command's response chunk by chunk."""
+    async for chunk in ai.run_stream(command):
+        console.print(chunk, end="", markup=False, highlight=False)
+    console.print()
+
+
 def _interactive_mode(provider: str, model: str | None, api_key: str | None):
     """Run interactive REPL."""
     console.print(
@@ -188,7 +219,15 @@ def _show_help():
 @click.option("--host", default="0.0.0.0", help="Host to bind")
 @click.option("--port", default=8000, help="Port to bind")
 @click.option("--provider", "-p", default="openai", help="Default provider")
-def serve(host: str, port: int, provider: str):
+@click.option(
+    "--warm-up",
+    "-w",
+    "warm_up",
+    multiple=True,
+    help='Provider to warm up at startup, as "provider" or "provider:model" (repeatable)',
+)
+@click.option("--probe", is_flag=True, help="Send a tiny completion to each warm-up target")
+def serve(host: str, port: int, provider: str, warm_up: tuple[str, ...], probe: bool):
     """Start AILANG API server."""
     try:
         import uvicorn
@@ -199,10 +238,58 @@ def serve(host: str, port: int, provider: str):
         sys.exit(1)
 
     console.print(f"[green]Starting AILANG server on {host}:{port}[/green]")
-    app = create_app(default_provider=provider)
+    app = create_app(default_provider=provider, warm_up=list(warm_up), probe=probe)
     uvicorn.run(app, host=host, port=port)
 
 
+@main.command()
+@click.argument("commands_file", type=click.File("r"))
+@click.option("--provider", "-p", default="openai", help="AI provider")
+@click.option("--model", "-m", help="Model name")
+@click.option("--api-key", "-k", help="API key")
+@click.option("--concurrency", "-c", default=8, help="Maximum concurrent requests")
+@click.option("--unordered", is_flag=True, help="Output results as they complete")
+@click.option(
+    "--warm-up", "warm_up", is_flag=True, help="Open connections before the first command"
+)
+def batch(
+    commands_file,
+    provider: str,
+    model: str | None,
+    api_key: str | None,
+    concurrency: int,
+    unordered: bool,
+    warm_up: bool,
+):
+    """Run one AILANG command per line of a file ("-" for stdin), printing JSON lines."""
+    from rich.progress import Progress
+
+    commands = [line.strip() for line in commands_file if line.strip()]
+    ai = AILANG(provider=provider, model=model, api_key=api_key)
+    err_console = Console(stderr=True)
+
+    async def run_all():
+        if warm_up:
+            await ai.warm_up()
+        with Progress(console=err_console) as progress:
+            task = progress.add_task("Running", total=len(commands))
+
+            def advance(completed: int, total: int | None):
+                progress.update(task, completed=completed)
+
+            async for item in ai.run_many_async(
+                commands, concurrency, ordered=not unordered, progress=advance
+            ):
+                record = {"index": item.index, "command": item.input}
+                if item.ok:
+                    record["result"] = item.result
+                else:
+                    record["error"] = str(item.error)
+                click.echo(json.dumps(record))
+
+    asyncio.run(run_all())
+
+
 @main.command()
 @click.argument("prompt")
 def reverse(prompt: str):
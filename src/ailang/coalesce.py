@@ -0,0 +1,79 @@
+"""
+AILANG Coalescing - Share one in-flight call between identical concurrent requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from ailang.deadline import no_deadline
+
+
+class _Flight:
+    """One upstream call and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+async def _detached(call: Callable[[], Awaitable[Any]]) -> Any:
+    # The shared call belongs to no single caller: each waiter enforces its
+    # own deadline, and the call is cancelled once nobody is waiting
+    with no_deadline():
+        return await call()
+
+
+class Coalescer:
+    """
+    Singleflight: concurrent calls with the same key share one execution.
+
+    The first caller starts the call; later callers with the same key wait
+    for its result (or error) instead of starting their own. A waiter that is
+    cancelled only stops waiting; the call itself is cancelled when its last
+    waiter leaves. Keys are forgotten as soon as the call finishes, so
+    nothing is cached.
+
+    Example:
+        coalescer = Coalescer()
+        result, shared = await coalescer.run(("openai", prompt), lambda: fetch(prompt))
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._flights)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Run ``call`` or join an identical call already in flight.
+
+        Returns:
+            (result, shared), where ``shared`` is True for callers that joined
+            another caller's call
+        """
+        # Tasks belong to one event loop, so only calls on the same loop are shared
+        key = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(_detached(call)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -23,6 +23,8 @@ import re
 from dataclasses import dataclass, field
 from typing import Any
 
+from ailang.usage import Usage
+
 # =============================================================================
 # Type Definitions
 # =============================================================================
@@ -46,6 +48,15 @@ class TypeConstraint:
         """Parse/coerce a value to this type."""
         return value
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        """
+        Convert to a JSON Schema fragment.
+
+        With ``strict``, only keywords accepted by OpenAI's strict structured
+        outputs are used; anything else is left to local validation.
+        """
+        raise NotImplementedError
+
 
 @dataclass
 class Str(TypeConstraint):
@@ -82,6 +93,17 @@ class Str(TypeConstraint):
             s = s[: self.max - 3] + "..."
         return s
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        schema: dict[str, Any] = {"type": "string", "description": self.to_prompt()}
+        if not strict:
+            if self.max:
+                schema["maxLength"] = self.max
+            if self.min:
+                schema["minLength"] = self.min
+            if self.pattern:
+                schema["pattern"] = self.pattern
+        return schema
+
 
 @dataclass
 class Int(TypeConstraint):
@@ -116,6 +138,14 @@ class Int(TypeConstraint):
     def parse(self, value: Any) -> int:
         return int(value)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        schema: dict[str, Any] = {"type": "integer"}
+        if self.min is not None:
+            schema["minimum"] = self.min
+        if self.max is not None:
+            schema["maximum"] = self.max
+        return schema
+
 
 @dataclass
 class Float(TypeConstraint):
@@ -146,6 +176,14 @@ class Float(TypeConstraint):
             v = round(v, self.precision)
         return v
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        schema: dict[str, Any] = {"type": "number"}
+        if self.min is not None:
+            schema["minimum"] = self.min
+        if self.max is not None:
+            schema["maximum"] = self.max
+        return schema
+
 
 @dataclass
 class Bool(TypeConstraint):
@@ -170,6 +208,9 @@ class Bool(TypeConstraint):
             return value.lower() in ("true", "yes", "1")
         return bool(value)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        return {"type": "boolean"}
+
 
 @dataclass
 class Code(TypeConstraint):
@@ -192,6 +233,9 @@ class Code(TypeConstraint):
         s = re.sub(r"\n?```$", "", s)
         return s.strip()
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        return {"type": "string", "description": self.to_prompt()}
+
 
 @dataclass
 class List_(TypeConstraint):
@@ -246,6 +290,22 @@ class List_(TypeConstraint):
             return [self.item_type.parse(item) for item in value]
         return list(value)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        schema: dict[str, Any] = {"type": "array"}
+        if self.item_type:
+            schema["items"] = self.item_type.to_json_schema(strict)
+        elif strict:
+            # Strict mode needs an item schema
+            schema["items"] = {"type": "string"}
+        if self.exact_items:
+            schema["minItems"] = schema["maxItems"] = self.exact_items
+        else:
+            if self.min_items:
+                schema["minItems"] = self.min_items
+            if self.max_items:
+                schema["maxItems"] = self.max_items
+        return schema
+
 
 @dataclass
 class Optional_(TypeConstraint):
@@ -268,6 +328,9 @@ class Optional_(TypeConstraint):
             return None
         return self.inner_type.parse(value)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        return {"anyOf": [self.inner_type.to_json_schema(strict), {"type": "null"}]}
+
 
 @dataclass
 class Enum_(TypeConstraint):
@@ -286,6 +349,9 @@ class Enum_(TypeConstraint):
     def parse(self, value: Any) -> str:
         return str(value)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        return {"type": "string", "enum": list(self.choices)}
+
 
 # =============================================================================
 # Convenience constructors (lowercase, like typing module)
@@ -370,6 +436,36 @@ class OutputContract:
         lines.extend(["", "Return ONLY the JSON object, no other text or markdown."])
         return "\n".join(lines)
 
+    def to_json_schema(self, strict: bool = False) -> dict[str, Any]:
+        """
+        Compile the contract to a JSON Schema object.
+
+        Args:
+            strict: Follow the rules of OpenAI strict structured outputs: every
+                field is required (optional fields accept null) and keywords
+                strict mode rejects are omitted. ``parse_response`` still
+                checks the full contract.
+
+        Example:
+            OutputContract({"n": int_(min=0)}).to_json_schema()
+            # {"type": "object", "properties": {"n": {"type": "integer", "minimum": 0}},
+            #  "required": ["n"], "additionalProperties": False}
+        """
+        required = [
+            name
+            for name, type_constraint in self.schema.items()
+            if strict or not isinstance(type_constraint, Optional_)
+        ]
+        return {
+            "type": "object",
+            "properties": {
+                name: type_constraint.to_json_schema(strict)
+                for name, type_constraint in self.schema.items()
+            },
+            "required": required,
+            "additionalProperties": False,
+        }
+
     def parse_response(self, response: str) -> dict[str, Any]:
         """Parse and validate an AI response against the contract."""
         # Try to extract JSON from response
@@ -407,6 +503,37 @@ class OutputContract:
 
         return result
 
+    def vote(self, candidates: list[dict[str, Any]]) -> tuple[int, dict[str, Any]]:
+        """
+        Combine parsed candidates by majority vote.
+
+        enum, int and bool fields take their most common value (ties go to the
+        earliest candidate). The other fields come from the first candidate
+        that agrees with every voted value, or the first candidate if none does.
+
+        Returns:
+            (index of the candidate the other fields came from, voted data)
+        """
+        voted = {}
+        for name, type_constraint in self.schema.items():
+            inner = (
+                type_constraint.inner_type
+                if isinstance(type_constraint, Optional_)
+                else type_constraint
+            )
+            if isinstance(inner, (Enum_, Int, Bool)):
+                values = [candidate[name] for candidate in candidates]
+                voted[name] = max(values, key=lambda v: (values.count(v), -values.index(v)))
+        index = next(
+            (
+                i
+                for i, candidate in enumerate(candidates)
+                if all(candidate[name] == value for name, value in voted.items())
+            ),
+            0,
+        )
+        return index, {**candidates[index], **voted}
+
 
 class ContractError(Exception):
     """Raised when a response doesn't match its contract."""
@@ -416,10 +543,17 @@ class ContractError(Exception):
 
 @dataclass
 class ContractResult:
-    """Result of an AI call with a contract - provides dot access to fields."""
+    """
+    Result of an AI call with a contract - provides dot access to fields.
+
+    ``_raw`` is the final response (a Completion with its latency, model and
+    provider when it came from a provider) and ``_usage`` the tokens of every
+    call that produced the result, including chain steps and the contract retry.
+    """
 
     _data: dict[str, Any]
     _raw: str = ""
+    _usage: Usage = field(default_factory=Usage)
 
     def __getattr__(self, name: str) -> Any:
         if name.startswith("_"):
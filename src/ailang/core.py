@@ -4,20 +4,40 @@ AILANG Core - Main interface for executing AILANG commands.
 
 import asyncio
 import os
+from collections.abc import AsyncIterator, Iterable
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from ailang.batch import BatchResult, ProgressCallback, bounded_map, collect
+from ailang.breaker import CircuitPolicy
 from ailang.contracts import (
     ContractError,
     ContractResult,
     OutputContract,
     TypeConstraint,
 )
+from ailang.deadline import deadline
+from ailang.images import IMAGE_ACTIONS, store_image
 from ailang.parser import AILangAST, parse
-from ailang.providers import ProviderConfig, get_provider
+from ailang.providers import (
+    Prompt,
+    PromptSegment,
+    Provider,
+    ProviderConfig,
+    get_provider,
+    get_shared_provider,
+)
+from ailang.replay import ReplayPolicy
+from ailang.retry import RetryPolicy
 from ailang.transpiler import transpile
+from ailang.usage import Completion, Ledger, ModelPrice, Usage
+
+
+def _contract_segment(contract: OutputContract) -> PromptSegment:
+    """Output format instructions, which stay the same for every call with a contract."""
+    return PromptSegment(contract.to_prompt_instructions(), role="system", cacheable=True)
 
 
 class AILANG:
@@ -49,23 +69,37 @@ class AILANG:
 
     def __init__(
         self,
-        provider: str = "openai",
+        provider: str | Provider = "openai",
         api_key: str | None = None,
         model: str | None = None,
         base_url: str | None = None,
         config_path: str | None = None,
+        shared: bool = True,
+        prices: dict[str, ModelPrice] | None = None,
+        image_dir: str | Path | None = None,
         **kwargs: Any,
     ):
         """
         Initialize AILANG.
 
         Args:
-            provider: AI provider name (openai, anthropic, ollama, google)
+            provider: AI provider name (openai, anthropic, ollama, google, replay), or a
+                ready-made Provider instance (e.g. a HedgedProvider)
             api_key: API key (or set via env var)
             model: Model name (provider-specific)
             base_url: Custom API endpoint URL (for OpenAI-compatible servers)
             config_path: Path to config file
-            **kwargs: Additional provider options (temperature, max_tokens)
+            shared: Use the process-wide provider instance for these settings, so
+                AILANG objects share pooled clients and rate limiters
+            prices: Model prices used to estimate cost in ``self.ledger``
+            image_dir: Directory generated images are saved to (also a config option)
+            **kwargs: Additional provider options (temperature, max_tokens,
+                max_connections, max_keepalive_connections, keepalive_expiry, http2,
+                retry, max_retries, requests_per_minute, tokens_per_minute,
+                batch_poll_interval, batch_concurrency, prompt_caching, cache_min_chars,
+                structured_output, keep_alive, num_ctx, num_predict, request_timeout,
+                context_window, auto_max_tokens, contract_max_tokens, truncate_prompts,
+                circuit_breaker, coalesce, replay)
 
         Examples:
             # Standard OpenAI
@@ -85,18 +119,34 @@ class AILANG:
                 base_url="https://your-resource.openai.azure.com/openai/deployments/your-deployment",
                 api_key="your-azure-key",
             )
+
+            # Pre-built provider
+            ai = AILANG(provider=HedgedProvider(primary, secondary))
         """
+        self.shared = shared
+        # Tokens, latency and cost of every call made through this instance
+        self.ledger = Ledger(prices)
+
+        if isinstance(provider, Provider):
+            self.shared = False
+            self.provider_name = provider.name
+            self.provider_config = provider.config
+            self._provider: Provider | None = provider
+            self.image_dir = Path(image_dir or ".")
+            return
+
         self.provider_name = provider
 
         # Load config
         config = self._load_config(config_path)
+        self.image_dir = Path(image_dir or config.get("image_dir") or ".")
 
         # Merge with explicit args
         api_key = api_key or config.get("api_key") or self._get_env_key(provider)
         model = model or config.get("model")
         base_url = base_url or config.get("base_url")
 
-        if not api_key and provider not in ("ollama", "local"):
+        if not api_key and provider not in ("ollama", "local", "replay"):
             raise ValueError(f"API key required for {provider}. Set via argument or env var.")
 
         self.provider_config = ProviderConfig(
@@ -107,6 +157,56 @@ class AILANG:
             base_url=base_url,
         )
 
+        # Connection pool and rate limit options
+        for option in (
+            "max_connections",
+            "max_keepalive_connections",
+            "keepalive_expiry",
+            "http2",
+            "requests_per_minute",
+            "tokens_per_minute",
+            "batch_poll_interval",
+            "batch_concurrency",
+            "prompt_caching",
+            "cache_min_chars",
+            "structured_output",
+            "keep_alive",
+            "num_ctx",
+            "num_predict",
+            "request_timeout",
+            "context_window",
+            "auto_max_tokens",
+            "contract_max_tokens",
+            "truncate_prompts",
+            "coalesce",
+        ):
+            if option in kwargs or option in config:
+                setattr(self.provider_config, option, kwargs.get(option, config.get(option)))
+
+        # Retry policy for transient provider errors
+        if "retry" in kwargs:
+            self.provider_config.retry = kwargs["retry"]
+        elif "max_retries" in kwargs or "max_retries" in config:
+            max_retries = int(kwargs.get("max_retries", config.get("max_retries", 3)))
+            self.provider_config.retry = RetryPolicy(max_retries=max_retries)
+
+        # Circuit breaker for the endpoint (a CircuitPolicy, or its options from a config file)
+        breaker = kwargs.get("circuit_breaker", config.get("circuit_breaker"))
+        if isinstance(breaker, dict):
+            breaker = CircuitPolicy(**breaker)
+        if breaker is not None:
+            self.provider_config.circuit_breaker = breaker
+
+        # Cassette and simulated backend for the replay provider
+        replay = kwargs.get("replay", config.get("replay"))
+        if isinstance(replay, dict):
+            replay = ReplayPolicy(**replay)
+        if replay is not None:
+            self.provider_config.replay = replay
+            if replay.record and not self.provider_config.api_key:
+                # Recording calls the real provider, which needs its own key
+                self.provider_config.api_key = self._get_env_key(replay.record) or ""
+
         self._provider = None
 
     def _load_config(self, config_path: str | None) -> dict[str, Any]:
@@ -145,33 +245,99 @@ class AILANG:
         return os.environ.get(var_name) if var_name else None
 
     @property
-    def provider(self):
+    def provider(self) -> Provider:
         """Lazy-load provider."""
         if self._provider is None:
-            self._provider = get_provider(self.provider_name, self.provider_config)
+            if self.shared:
+                self._provider = get_shared_provider(self.provider_name, self.provider_config)
+            else:
+                self._provider = get_provider(self.provider_name, self.provider_config)
         return self._provider
 
-    def run(self, command: str, **variables: str) -> str:
+    async def warm_up(self, probe: bool = False) -> None:
+        """
+        Open the provider's connections before the first call.
+
+        Call it from the event loop that will serve requests, since pooled
+        connections belong to the loop that opened them.
+
+        Args:
+            probe: Also send a tiny completion through the whole request path
+        """
+        await self.provider.warm_up(probe)
+
+    async def aclose(self) -> None:
+        """
+        Close the provider's pooled connections.
+
+        Shared providers stay open for other users; close them with
+        ``ailang.providers.shutdown_providers()``.
+        """
+        if self._provider is not None and not self.shared:
+            await self._provider.aclose()
+
+    def _record(self, action: str | None, response: str) -> Usage:
+        """Add a provider response to the ledger and return its token usage."""
+        if not isinstance(response, Completion):
+            return Usage()
+        self.ledger.record(action, response)
+        return response.usage
+
+    async def __aenter__(self) -> "AILANG":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def run(self, command: str, *, timeout: float | None = None, **variables: str) -> str:
         """
         Execute an AILANG command synchronously.
 
         Args:
             command: AILANG command string
+            timeout: Time budget in seconds for the whole call, retries included
             **variables: Values for {variable} placeholders
 
         Returns:
-            AI response string
+            AI response string; a Completion carrying the call's usage, latency,
+            model and provider. Image actions return the saved image's path.
+
+        Raises:
+            DeadlineExceededError: If the call didn't finish within ``timeout``
         """
-        return asyncio.run(self.run_async(command, **variables))
+        return asyncio.run(self.run_with(command, variables, timeout))
 
-    async def run_async(self, command: str, **variables: str) -> str:
+    async def run_async(
+        self, command: str, *, timeout: float | None = None, **variables: str
+    ) -> str:
         """
         Execute an AILANG command asynchronously.
 
         Args:
             command: AILANG command string
+            timeout: Time budget in seconds for the whole call, retries included
             **variables: Values for {variable} placeholders
 
+        Returns:
+            AI response string
+        """
+        return await self.run_with(command, variables, timeout)
+
+    async def run_with(
+        self, command: str, variables: dict[str, str], timeout: float | None = None
+    ) -> str:
+        """
+        Execute an AILANG command with its variables passed as a dict.
+
+        Unlike ``run_async``, any variable name works, including ones named
+        like a parameter (e.g. ``timeout``); use this for variables supplied
+        by users, as the bulk helpers and the REST API do.
+
+        Args:
+            command: AILANG command string
+            variables: Values for {variable} placeholders
+            timeout: Time budget in seconds for the whole call, retries included
+
         Returns:
             AI response string
         """
@@ -180,16 +346,69 @@ class AILANG:
 
         # Detect if image generation
         ast = parse(command)
-        if ast.action in ("img", "logo", "icon", "image"):
-            # Return image as bytes or save path
-            image_data = await self.provider.complete_with_image(prompt)
-            # For now, save and return path
-            output_path = Path("output.png")
-            output_path.write_bytes(image_data)
-            return f"Image saved to: {output_path}"
+        with deadline(timeout):
+            if ast.action in IMAGE_ACTIONS:
+                image_data = await self.provider.complete_with_image(prompt)
+                return str(await store_image(image_data, self.image_dir))
+
+            # Text completion
+            response = await self.provider.complete(prompt, action=ast.action)
+            self._record(ast.action, response)
+            return response
+
+    async def run_stream(self, command: str, **variables: str) -> AsyncIterator[str]:
+        """
+        Execute an AILANG command and yield the response as it is generated.
+
+        Args:
+            command: AILANG command string
+            **variables: Values for {variable} placeholders
+
+        Yields:
+            Chunks of the AI response text; the finished stream is added to
+            the ledger
+
+        Example:
+            async for chunk in ai.run_stream('write "short story" ~funny'):
+                print(chunk, end="", flush=True)
+        """
+        ast = parse(command)
+        if ast.action in IMAGE_ACTIONS:
+            # Images can't be streamed; yield the saved path once it's ready
+            yield await self.run_with(command, variables)
+            return
+
+        prompt = transpile(command, **variables)
+        async for chunk in self.provider.stream(
+            prompt,
+            action=ast.action,
+            on_complete=lambda completion: self.ledger.record(ast.action, completion),
+        ):
+            yield chunk
+
+    def image(self, command: str, n: int = 1, **variables: str) -> list[Path]:
+        """
+        Generate images and save them to ``image_dir``.
+
+        Args:
+            command: AILANG command string (e.g. 'img "sunset" !photo')
+            n: Number of variants, generated concurrently
+            **variables: Values for {variable} placeholders
+
+        Returns:
+            Path of each image, named by the SHA-256 of its content
 
-        # Text completion
-        return await self.provider.complete(prompt)
+        Example:
+            for path in ai.image('logo "coffee shop" !minimal', n=4):
+                print(path)
+        """
+        return asyncio.run(self.image_async(command, n, **variables))
+
+    async def image_async(self, command: str, n: int = 1, **variables: str) -> list[Path]:
+        """Async version of image()."""
+        prompt = transpile(command, **variables)
+        images = await self.provider.complete_images(prompt, n)
+        return list(await asyncio.gather(*(store_image(data, self.image_dir) for data in images)))
 
     def transpile_only(self, command: str, **variables: str) -> str:
         """
@@ -225,6 +444,10 @@ class AILANG:
         question: str,
         returns: dict[str, TypeConstraint],
         voice: str | None = None,
+        *,
+        timeout: float | None = None,
+        samples: int = 1,
+        vote: bool = False,
         **context: str,
     ) -> ContractResult:
         """
@@ -234,6 +457,11 @@ class AILANG:
             question: Natural language question/request
             returns: Output contract defining expected fields and types
             voice: Optional tone/style (e.g., "casual", "technical", "brief")
+            timeout: Time budget in seconds, shared by the call and its contract retry
+            samples: Candidates to request at once (one request on OpenAI-compatible
+                servers); the first valid one is returned
+            vote: With several samples, settle enum, int and bool fields by
+                majority vote across the valid candidates
             **context: Additional context variables
 
         Returns:
@@ -251,20 +479,118 @@ class AILANG:
             print(result.tldr)
             print(result.steps)
         """
-        return asyncio.run(self.ask_async(question, returns, voice, **context))
+        return asyncio.run(
+            self.ask_async(
+                question, returns, voice, timeout=timeout, samples=samples, vote=vote, **context
+            )
+        )
 
     async def ask_async(
         self,
         question: str,
         returns: dict[str, TypeConstraint],
         voice: str | None = None,
+        *,
+        timeout: float | None = None,
+        samples: int = 1,
+        vote: bool = False,
         **context: str,
     ) -> ContractResult:
         """Async version of ask()."""
+        return await self._ask(
+            question, returns, voice, context, timeout=timeout, samples=samples, vote=vote
+        )
+
+    async def _ask(
+        self,
+        question: str,
+        returns: dict[str, TypeConstraint],
+        voice: str | None,
+        context: dict[str, str],
+        *,
+        timeout: float | None = None,
+        samples: int = 1,
+        vote: bool = False,
+    ) -> ContractResult:
+        """
+        Ask with the context as a dict.
+
+        Bulk helpers call this instead of ``ask_async`` so context keys named
+        like a parameter (``samples``, ``vote``, ``timeout``) stay context.
+        """
         contract = OutputContract(returns)
+        full_prompt = self._build_ask_prompt(question, contract, voice, context)
+
+        with deadline(timeout):
+            if samples > 1:
+                # Several candidates in one round trip instead of a serial retry
+                result, usage = await self._ask_samples(full_prompt, contract, samples, vote)
+                if result is not None:
+                    return result
+            else:
+                # Execute
+                response = await self.provider.complete(full_prompt, contract, action="ask")
+                usage = self._record("ask", response)
+
+                # Parse and validate against contract
+                try:
+                    data = contract.parse_response(response)
+                    return ContractResult(_data=data, _raw=response, _usage=usage)
+                except ContractError:
+                    pass
+
+            # Retry once with stricter instructions
+            retry_prompt = full_prompt.extend(
+                PromptSegment("IMPORTANT: Return ONLY valid JSON, no explanations.")
+            )
+            response = await self.provider.complete(retry_prompt, contract, action="ask")
+            usage = usage + self._record("ask", response)
+            data = contract.parse_response(response)
+            return ContractResult(_data=data, _raw=response, _usage=usage)
+
+    async def _ask_samples(
+        self, prompt: Prompt, contract: OutputContract, samples: int, vote: bool
+    ) -> tuple[ContractResult | None, Usage]:
+        """
+        Request several candidates and pick one.
+
+        Returns the first valid candidate (or the majority vote of the valid
+        ones with ``vote``), or None if none satisfies the contract, together
+        with the usage of the request.
+        """
+        responses = await self.provider.complete_samples(prompt, contract, samples, action="ask")
+        usage = Usage()
+        valid: list[tuple[str, dict[str, Any]]] = []
+        for response in responses:
+            usage = usage + self._record("ask", response)
+            try:
+                valid.append((response, contract.parse_response(response)))
+            except ContractError:
+                continue
+        if not valid:
+            return None, usage
+        if not vote:
+            response, data = valid[0]
+        else:
+            index, data = contract.vote([data for _, data in valid])
+            response = valid[index][0]
+        return ContractResult(_data=data, _raw=response, _usage=usage), usage
+
+    def _build_ask_prompt(
+        self,
+        question: str,
+        contract: OutputContract,
+        voice: str | None,
+        context: dict[str, str],
+    ) -> Prompt:
+        """
+        Build the full prompt for an ask() call.
 
-        # Build prompt
-        prompt_parts = []
+        Voice and contract instructions are marked as cacheable system text,
+        and context values as cacheable, so providers with prompt caching can
+        reuse the stable prefix across calls that share it.
+        """
+        segments = []
 
         # Add voice/style
         if voice:
@@ -276,42 +602,32 @@ class AILANG:
                 "brief": "Be as brief as possible.",
                 "detailed": "Be thorough and detailed.",
             }
-            if voice in voice_instructions:
-                prompt_parts.append(voice_instructions[voice])
-            else:
-                prompt_parts.append(f"Tone: {voice}.")
+            segments.append(
+                PromptSegment(
+                    voice_instructions.get(voice, f"Tone: {voice}."),
+                    role="system",
+                    cacheable=True,
+                )
+            )
 
         # Add context
         for key, value in context.items():
-            prompt_parts.append(f"{key}: {value}")
+            segments.append(PromptSegment(f"{key}: {value}", cacheable=True))
 
         # Add the question
-        prompt_parts.append(question)
+        segments.append(PromptSegment(question))
 
         # Add output contract instructions
-        prompt_parts.append("")
-        prompt_parts.append(contract.to_prompt_instructions())
-
-        full_prompt = "\n\n".join(prompt_parts)
+        segments.append(PromptSegment(""))
+        segments.append(_contract_segment(contract))
 
-        # Execute
-        response = await self.provider.complete(full_prompt)
-
-        # Parse and validate against contract
-        try:
-            data = contract.parse_response(response)
-            return ContractResult(_data=data, _raw=response)
-        except ContractError:
-            # Retry once with stricter instructions
-            retry_prompt = full_prompt + "\n\nIMPORTANT: Return ONLY valid JSON, no explanations."
-            response = await self.provider.complete(retry_prompt)
-            data = contract.parse_response(response)
-            return ContractResult(_data=data, _raw=response)
+        return Prompt(segments)
 
     def chain(
         self,
         *commands: str,
         returns: dict[str, TypeConstraint] | None = None,
+        timeout: float | None = None,
         **variables: str,
     ) -> str | ContractResult:
         """
@@ -320,6 +636,7 @@ class AILANG:
         Args:
             *commands: AILANG commands to execute in sequence
             returns: Optional output contract for final result
+            timeout: Time budget in seconds for the whole chain
             **variables: Variables for the first command
 
         Returns:
@@ -334,34 +651,417 @@ class AILANG:
                 returns={"fixed": code("python"), "tests": code("python")}
             )
         """
-        return asyncio.run(self.chain_async(*commands, returns=returns, **variables))
+        return asyncio.run(
+            self.chain_async(*commands, returns=returns, timeout=timeout, **variables)
+        )
 
     async def chain_async(
         self,
         *commands: str,
         returns: dict[str, TypeConstraint] | None = None,
+        timeout: float | None = None,
         **variables: str,
     ) -> str | ContractResult:
         """Async version of chain()."""
         # Execute commands in sequence, passing output as {input} to next
         result = ""
         current_vars = variables.copy()
+        usage = Usage()
 
-        for i, command in enumerate(commands):
-            if i > 0:
-                current_vars["input"] = result
-                current_vars["previous"] = result
+        with deadline(timeout):
+            for i, command in enumerate(commands):
+                if i > 0:
+                    current_vars["input"] = result
+                    current_vars["previous"] = result
 
-            prompt = transpile(command, **current_vars)
+                prompt = transpile(command, **current_vars)
+                action = parse(command).action
 
-            # For last command, add output contract if specified
-            if i == len(commands) - 1 and returns:
-                contract = OutputContract(returns)
-                prompt += "\n\n" + contract.to_prompt_instructions()
-                response = await self.provider.complete(prompt)
-                data = contract.parse_response(response)
-                return ContractResult(_data=data, _raw=response)
+                # For last command, add output contract if specified
+                if i == len(commands) - 1 and returns:
+                    contract = OutputContract(returns)
+                    prompt = Prompt([PromptSegment(prompt), _contract_segment(contract)])
+                    response = await self.provider.complete(prompt, contract, action)
+                    usage = usage + self._record(action, response)
+                    data = contract.parse_response(response)
+                    return ContractResult(_data=data, _raw=response, _usage=usage)
 
-            result = await self.provider.complete(prompt)
+                result = await self.provider.complete(prompt, action=action)
+                usage = usage + self._record(action, result)
 
         return result
+
+    # =========================================================================
+    # Bulk API - Many calls with bounded concurrency
+    # =========================================================================
+
+    def run_many(
+        self,
+        commands: Iterable[str],
+        concurrency: int = 8,
+        progress: ProgressCallback | None = None,
+        **variables: str,
+    ) -> list[BatchResult]:
+        """
+        Execute many AILANG commands concurrently.
+
+        Args:
+            commands: AILANG command strings
+            concurrency: Maximum number of concurrent provider calls
+            progress: Called with (completed, total) after each command
+            **variables: Values for {variable} placeholders, shared by all commands
+
+        Returns:
+            BatchResult per command, in input order. Failed commands carry
+            their error instead of aborting the batch.
+
+        Example:
+            results = ai.run_many(['write "haiku"', 'write "limerick"'])
+            for r in results:
+                print(r.result if r.ok else f"failed: {r.error}")
+        """
+        return asyncio.run(
+            collect(self.run_many_async(commands, concurrency, True, progress, **variables))
+        )
+
+    async def run_many_async(
+        self,
+        commands: Iterable[str],
+        concurrency: int = 8,
+        ordered: bool = True,
+        progress: ProgressCallback | None = None,
+        **variables: str,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Async version of run_many(), yielding results as they are ready.
+
+        With ``ordered=False`` results are yielded as soon as each completes.
+        """
+
+        async def run_one(command: str) -> str:
+            return await self.run_with(command, variables)
+
+        async for result in bounded_map(run_one, commands, concurrency, ordered, progress):
+            yield result
+
+    def map(
+        self,
+        command: str,
+        rows: Iterable[dict[str, str]],
+        concurrency: int = 8,
+        progress: ProgressCallback | None = None,
+    ) -> list[BatchResult]:
+        """
+        Execute one AILANG command for each set of variables.
+
+        Args:
+            command: AILANG command string with {variable} placeholders
+            rows: Variable dicts, one per call
+            concurrency: Maximum number of concurrent provider calls
+            progress: Called with (completed, total) after each row
+
+        Returns:
+            BatchResult per row, in input order
+
+        Example:
+            results = ai.map(
+                'summarize {text} !brief',
+                [{"text": article} for article in articles],
+                concurrency=32,
+            )
+        """
+        return asyncio.run(collect(self.map_async(command, rows, concurrency, progress=progress)))
+
+    async def map_async(
+        self,
+        command: str,
+        rows: Iterable[dict[str, str]],
+        concurrency: int = 8,
+        ordered: bool = True,
+        progress: ProgressCallback | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Async version of map(), yielding results as they are ready."""
+
+        async def run_row(row: dict[str, str]) -> str:
+            return await self.run_with(command, row)
+
+        async for result in bounded_map(run_row, rows, concurrency, ordered, progress):
+            yield result
+
+    def ask_many(
+        self,
+        items: Iterable[str | dict[str, str]],
+        returns: dict[str, TypeConstraint],
+        question: str | None = None,
+        voice: str | None = None,
+        concurrency: int = 8,
+        progress: ProgressCallback | None = None,
+        **context: str,
+    ) -> list[BatchResult]:
+        """
+        Ask many questions concurrently with the same output contract.
+
+        Args:
+            items: Questions, or context dicts to combine with ``question``
+            returns: Output contract defining expected fields and types
+            question: Question asked for every context dict in ``items``
+            voice: Optional tone/style
+            concurrency: Maximum number of concurrent provider calls
+            progress: Called with (completed, total) after each item
+            **context: Context variables shared by every call
+
+        Returns:
+            BatchResult per item, in input order, with a ContractResult on success
+
+        Example:
+            results = ai.ask_many(
+                [{"review": text} for text in reviews],
+                question="classify this review",
+                returns={"sentiment": enum("positive", "negative", "neutral")},
+            )
+        """
+        return asyncio.run(
+            collect(
+                self.ask_many_async(
+                    items, returns, question, voice, concurrency, True, progress, **context
+                )
+            )
+        )
+
+    async def ask_many_async(
+        self,
+        items: Iterable[str | dict[str, str]],
+        returns: dict[str, TypeConstraint],
+        question: str | None = None,
+        voice: str | None = None,
+        concurrency: int = 8,
+        ordered: bool = True,
+        progress: ProgressCallback | None = None,
+        **context: str,
+    ) -> AsyncIterator[BatchResult]:
+        """Async version of ask_many(), yielding results as they are ready."""
+
+        async def ask_one(item: str | dict[str, str]) -> ContractResult:
+            if isinstance(item, str):
+                return await self._ask(item, returns, voice, context)
+            if question is None:
+                raise ValueError("question is required when items are context dicts")
+            return await self._ask(question, returns, voice, {**context, **item})
+
+        async for result in bounded_map(ask_one, items, concurrency, ordered, progress):
+            yield result
+
+    # =========================================================================
+    # Offline batch jobs - One provider batch job for many prompts
+    # =========================================================================
+
+    def run_batch(
+        self,
+        commands: Iterable[str],
+        progress: ProgressCallback | None = None,
+        **variables: str,
+    ) -> list[BatchResult]:
+        """
+        Execute many AILANG commands as one offline batch job.
+
+        Providers with a batch API (OpenAI Batch API) submit a single job and
+        poll until it finishes, trading latency for higher throughput limits
+        and lower cost. Other providers complete the commands concurrently.
+
+        Args:
+            commands: AILANG command strings (text actions)
+            progress: Called with (completed, total) as results arrive
+            **variables: Values for {variable} placeholders, shared by all commands
+
+        Returns:
+            BatchResult per command, in input order
+        """
+        return asyncio.run(self.run_batch_async(commands, progress, **variables))
+
+    async def run_batch_async(
+        self,
+        commands: Iterable[str],
+        progress: ProgressCallback | None = None,
+        **variables: str,
+    ) -> list[BatchResult]:
+        """Async version of run_batch()."""
+        commands = list(commands)
+        prompts = [transpile(command, **variables) for command in commands]
+        results = [BatchResult(i, command) for i, command in enumerate(commands)]
+        completed = 0
+        async for item in self.provider.complete_batch(prompts):
+            if item.error is None:
+                self._record(parse(commands[item.index]).action, item.result)
+            results[item.index].result = item.result
+            results[item.index].error = item.error
+            completed += 1
+            if progress is not None:
+                progress(completed, len(results))
+        return results
+
+    def ask_batch(
+        self,
+        items: Iterable[str | dict[str, str]],
+        returns: dict[str, TypeConstraint],
+        question: str | None = None,
+        voice: str | None = None,
+        progress: ProgressCallback | None = None,
+        **context: str,
+    ) -> list[BatchResult]:
+        """
+        Ask many questions as one offline batch job, validating each answer.
+
+        Args:
+            items: Questions, or context dicts to combine with ``question``
+            returns: Output contract defining expected fields and types
+            question: Question asked for every context dict in ``items``
+            voice: Optional tone/style
+            progress: Called with (completed, total) as results arrive
+            **context: Context variables shared by every call
+
+        Returns:
+            BatchResult per item, in input order, with a ContractResult on
+            success or a ContractError if the answer didn't match the contract
+
+        Example:
+            results = ai.ask_batch(
+                [{"ticket": t} for t in tickets],
+                question="extract the product and severity",
+                returns={"product": str_(), "severity": enum("low", "high")},
+            )
+        """
+        return asyncio.run(
+            self.ask_batch_async(items, returns, question, voice, progress, **context)
+        )
+
+    async def ask_batch_async(
+        self,
+        items: Iterable[str | dict[str, str]],
+        returns: dict[str, TypeConstraint],
+        question: str | None = None,
+        voice: str | None = None,
+        progress: ProgressCallback | None = None,
+        **context: str,
+    ) -> list[BatchResult]:
+        """Async version of ask_batch()."""
+        contract = OutputContract(returns)
+        items = list(items)
+        prompts: list[str] = []
+        for item in items:
+            if isinstance(item, str):
+                prompts.append(self._build_ask_prompt(item, contract, voice, context))
+            elif question is None:
+                raise ValueError("question is required when items are context dicts")
+            else:
+                prompts.append(
+                    self._build_ask_prompt(question, contract, voice, {**context, **item})
+                )
+
+        results = [BatchResult(i, item) for i, item in enumerate(items)]
+        completed = 0
+        async for outcome in self.provider.complete_batch(prompts, contract):
+            result = results[outcome.index]
+            if outcome.error is not None:
+                result.error = outcome.error
+            else:
+                usage = self._record("ask", outcome.result)
+                try:
+                    data = contract.parse_response(outcome.result)
+                    result.result = ContractResult(_data=data, _raw=outcome.result, _usage=usage)
+                except ContractError as e:
+                    result.error = e
+            completed += 1
+            if progress is not None:
+                progress(completed, len(results))
+        return results
+
+    def chain_batch(
+        self,
+        *commands: str,
+        rows: Iterable[dict[str, str]],
+        returns: dict[str, TypeConstraint] | None = None,
+    ) -> list[BatchResult]:
+        """
+        Run a chain over many rows, submitting each step as one batch job.
+
+        Step N for every row is submitted together once step N-1 has finished;
+        rows that fail a step are dropped from later steps.
+
+        Args:
+            *commands: AILANG commands to execute in sequence
+            rows: Variable dicts for the first command, one per chain
+            returns: Optional output contract for the final step
+
+        Returns:
+            BatchResult per row, in input order (str or ContractResult on success)
+
+        Example:
+            results = ai.chain_batch(
+                'analyze {code} ^security',
+                'fix !all',
+                rows=[{"code": source} for source in files],
+                returns={"fixed": code("python")},
+            )
+        """
+        return asyncio.run(self.chain_batch_async(*commands, rows=rows, returns=returns))
+
+    async def chain_batch_async(
+        self,
+        *commands: str,
+        rows: Iterable[dict[str, str]],
+        returns: dict[str, TypeConstraint] | None = None,
+    ) -> list[BatchResult]:
+        """Async version of chain_batch()."""
+        rows = list(rows)
+        contract = OutputContract(returns) if returns else None
+        results = [BatchResult(i, row) for i, row in enumerate(rows)]
+        outputs: dict[int, str] = {}
+        usages: dict[int, Usage] = {}
+
+        for step, command in enumerate(commands):
+            action = parse(command).action
+            step_contract = contract if step == len(commands) - 1 else None
+            active = []
+            prompts = []
+            for result in results:
+                if not result.ok:
+                    continue
+                variables = dict(rows[result.index])
+                if step > 0:
+                    variables["input"] = outputs[result.index]
+                    variables["previous"] = outputs[result.index]
+                try:
+                    prompt = transpile(command, **variables)
+                except Exception as e:
+                    result.error = e
+                    continue
+                if step_contract:
+                    prompt = Prompt([PromptSegment(prompt), _contract_segment(step_contract)])
+                active.append(result.index)
+                prompts.append(prompt)
+
+            if not prompts:
+                break
+            async for item in self.provider.complete_batch(prompts, step_contract):
+                index = active[item.index]
+                if item.error is not None:
+                    results[index].error = item.error
+                else:
+                    outputs[index] = item.result
+                    usages[index] = usages.get(index, Usage()) + self._record(action, item.result)
+
+        for result in results:
+            if not result.ok:
+                continue
+            output = outputs.get(result.index, "")
+            if contract is None:
+                result.result = output
+                continue
+            try:
+                data = contract.parse_response(output)
+                result.result = ContractResult(
+                    _data=data, _raw=output, _usage=usages.get(result.index, Usage())
+                )
+            except ContractError as e:
+                result.error = e
+        return results
@@ -0,0 +1,97 @@
+"""
+AILANG Deadlines - Time budgets shared by every provider call in an operation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic) for the current task, if any. Tasks copy
+# the context they are created in, so concurrent sub-calls share the budget.
+_deadline: ContextVar[float | None] = ContextVar("ailang_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when an operation runs out of its time budget."""
+
+    pass
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or None without one."""
+    deadline_at = _deadline.get()
+    return None if deadline_at is None else deadline_at - time.monotonic()
+
+
+@contextmanager
+def deadline(timeout: float | None) -> Iterator[None]:
+    """
+    Run the enclosed calls under a budget of ``timeout`` seconds.
+
+    A nested budget never extends an enclosing one. ``None`` keeps the current
+    deadline (if any) unchanged.
+
+    Example:
+        with deadline(5.0):
+            await provider.complete(prompt)
+    """
+    if timeout is None:
+        yield
+        return
+    deadline_at = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        deadline_at = min(deadline_at, current)
+    token = _deadline.set(deadline_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """
+    Run the enclosed calls without any deadline, even inside an enclosing one.
+
+    For work that outlives a single caller, such as a call shared by several
+    waiters that each enforce their own budget.
+
+    Example:
+        with no_deadline():
+            task = asyncio.ensure_future(shared_call())
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await ``awaitable``, cancelling it if the current deadline passes first.
+
+    Raises:
+        DeadlineExceededError: If the budget is exhausted
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceededError("Deadline exceeded before the call started")
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except DeadlineExceededError:
+        raise
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError(f"Deadline exceeded after {left:.2f}s") from None
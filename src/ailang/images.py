@@ -0,0 +1,62 @@
+"""
+AILANG Images - Content-addressed storage for generated images.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+# Actions that generate an image instead of text
+IMAGE_ACTIONS = ("img", "logo", "icon", "image")
+
+_CHUNK_SIZE = 1 << 20
+
+
+def image_extension(data: bytes) -> str:
+    """File extension for image bytes, from their magic number."""
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data.startswith(b"\xff\xd8"):
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data.startswith(b"GIF8"):
+        return "gif"
+    return "bin"
+
+
+def _write_image(data: bytes, directory: Path) -> Path:
+    digest = hashlib.sha256(data).hexdigest()
+    path = directory / f"{digest}.{image_extension(data)}"
+    if path.exists():
+        # Same content, same name: nothing to write
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".ailang-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            view = memoryview(data)
+            for start in range(0, len(view), _CHUNK_SIZE):
+                f.write(view[start : start + _CHUNK_SIZE])
+        # Atomic rename, so concurrent writers never see a partial file
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return path
+
+
+async def store_image(data: bytes, directory: str | Path) -> Path:
+    """
+    Save image bytes under their SHA-256 digest and return the path.
+
+    Files are written in chunks to a temporary file and renamed into place
+    off the event loop, so concurrent calls never overwrite each other and
+    identical images are stored once.
+    """
+    return await asyncio.to_thread(_write_image, data, Path(directory))
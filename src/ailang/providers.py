@@ -2,8 +2,90 @@
 AILANG Providers - Adapters for various AI providers.
 """
 
+import asyncio
+import base64
+import dataclasses
+import hashlib
+import json
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from ailang.batch import BatchResult, bounded_map
+from ailang.breaker import CircuitBreaker, CircuitOpenError, CircuitPolicy, get_circuit_breaker
+from ailang.coalesce import Coalescer
+from ailang.contracts import ContractError, OutputContract
+from ailang.deadline import within_deadline
+from ailang.ratelimit import RateLimiter, TokenBucket, get_rate_limiter
+from ailang.replay import Cassette, ReplayPolicy, usage_to_dict
+from ailang.retry import RetryPolicy
+from ailang.tokens import (
+    PromptTooLongError,
+    count_tokens,
+    estimate_output_tokens,
+    is_reasoning_model,
+    model_context_window,
+    truncate_to_fit,
+)
+from ailang.usage import Completion, Usage
+
+T = TypeVar("T")
+
+
+@dataclass
+class PromptSegment:
+    """
+    One piece of a prompt.
+
+    ``role`` is "system" for standing instructions (persona, output format)
+    and "user" for the request itself. ``cacheable`` marks text that is
+    identical across many calls and worth caching on the provider side.
+    """
+
+    text: str
+    role: str = "user"
+    cacheable: bool = False
+
+
+class Prompt(str):
+    """
+    Prompt text that remembers how it was assembled.
+
+    A Prompt is the flat prompt string, so every provider can use it as-is;
+    providers with prompt caching use ``segments`` to place cache breakpoints.
+
+    Example:
+        prompt = Prompt([
+            PromptSegment("Use a formal tone.", role="system", cacheable=True),
+            PromptSegment("summarize this"),
+        ])
+    """
+
+    segments: tuple[PromptSegment, ...]
+
+    def __new__(cls, segments: list[PromptSegment], separator: str = "\n\n") -> "Prompt":
+        prompt = super().__new__(cls, separator.join(segment.text for segment in segments))
+        prompt.segments = tuple(segments)
+        return prompt
+
+    def extend(self, *segments: PromptSegment) -> "Prompt":
+        """Return a new prompt with segments appended."""
+        return Prompt([*self.segments, *segments])
+
+
+async def _gather_all(calls: list[Awaitable[T]]) -> list[T]:
+    """Run calls concurrently; if one fails, cancel the rest and raise."""
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
 
 
 @dataclass
@@ -15,155 +97,1273 @@ class ProviderConfig:
     base_url: str | None = None
     temperature: float = 0.7
     max_tokens: int = 2000
+    # Seconds one HTTP request may take; whole operations are bounded by the
+    # deadline passed to run/ask/chain
+    request_timeout: float = 120.0
+    # Token budgeting: context window (None looks it up by model), max_tokens
+    # capped per call by the room left, whether bounded contracts also shrink
+    # it (never for reasoning models), and whether prompts too long for the
+    # window are truncated instead of rejected
+    context_window: int | None = None
+    auto_max_tokens: bool = True
+    contract_max_tokens: bool = False
+    truncate_prompts: bool = False
+    # Connection pool for providers that talk HTTP directly (Ollama, Google)
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    # Fail fast (or use the policy's fallback) while the endpoint keeps failing;
+    # None disables the breaker
+    circuit_breaker: CircuitPolicy | None = None
+    # Identical concurrent completions (same model, settings, prompt and
+    # contract) share one upstream call
+    coalesce: bool = False
+    # Replay provider: cassette, recording and simulated backend behaviour
+    replay: ReplayPolicy | None = None
+    # Client-side limits, shared by all instances using the same provider and model
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    # Offline batch jobs (providers with a native batch API)
+    batch_poll_interval: float = 30.0
+    batch_concurrency: int = 8
+    # Provider-side prompt caching (Anthropic); context values at least this
+    # long get their own cache breakpoint
+    prompt_caching: bool = True
+    cache_min_chars: int = 4000
+    # Enforce contracts natively (response schema or forced tool call); None
+    # decides by model
+    structured_output: bool | None = None
+    # Ollama: how long the model stays loaded after a call (e.g. "30m", -1 for
+    # forever), context window and generation limit
+    keep_alive: str | int | None = "30m"
+    num_ctx: int | None = None
+    num_predict: int | None = None
 
 
 class Provider(ABC):
-    """Abstract base class for AI providers."""
+    """
+    Abstract base class for AI providers.
+
+    Subclasses implement ``_complete``, ``_complete_with_image`` and optionally
+    ``_stream``; the public methods wrap them with the shared retry policy,
+    rate limiter and circuit breaker, and cancel them when the caller's
+    deadline passes.
+    ``_complete`` may return a Completion carrying the call's token usage.
+    """
+
+    name = ""
+    model = ""
 
     def __init__(self, config: ProviderConfig):
         self.config = config
+        self._http: Any = None
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+        self._client: Any = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._limiter: RateLimiter | None = None
+        self._breaker: CircuitBreaker | None = None
+        self._coalescer = Coalescer()
+        # Running token totals reported by the provider's API
+        self.usage = Usage()
+
+    def _build_http_client(self) -> Any:
+        """Create a pooled httpx client from the provider config."""
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        try:
+            return httpx.AsyncClient(limits=limits, http2=self.config.http2)
+        except ImportError:
+            raise ImportError("HTTP/2 support required: pip install ailang[http2]")
+
+    def _http_client(self) -> Any:
+        """
+        Get the provider's long-lived HTTP client.
+
+        The client is created on first use and reused for every call so
+        connections stay alive between requests. Pooled connections belong to
+        the event loop that opened them, so a new client is built when called
+        from a different loop (e.g. successive ``asyncio.run`` calls).
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            self._http = self._build_http_client()
+            self._http_loop = loop
+        return self._http
+
+    def _build_client(self) -> Any:
+        """Create the SDK client, for providers built on a vendor SDK."""
+        raise NotImplementedError(f"{type(self).__name__} has no SDK client")
+
+    @property
+    def client(self) -> Any:
+        """
+        The provider's SDK client.
+
+        Like the HTTP client, an SDK client's connections belong to the event
+        loop that first used it, so a new client is built when used from a
+        different loop.
+        """
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._client is None or (
+            loop is not None and self._client_loop is not None and self._client_loop is not loop
+        ):
+            self._client = self._build_client()
+            self._client_loop = None
+        if loop is not None:
+            self._client_loop = loop
+        return self._client
+
+    @client.setter
+    def client(self, client: Any) -> None:
+        self._client = client
+        self._client_loop = None
+
+    async def aclose(self) -> None:
+        """Close pooled connections held by this provider."""
+        loop = asyncio.get_running_loop()
+        if self._http is not None:
+            if self._http_loop is loop:
+                await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+        if self._client is not None:
+            if self._client_loop in (None, loop):
+                await self._client.close()
+            self._client = None
+            self._client_loop = None
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        """Shared rate limiter for this provider and model, if limits are configured."""
+        if self._limiter is None and (
+            self.config.requests_per_minute or self.config.tokens_per_minute
+        ):
+            self._limiter = get_rate_limiter(
+                self.name or type(self).__name__,
+                self.model,
+                self.config.requests_per_minute,
+                self.config.tokens_per_minute,
+            )
+        return self._limiter
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker | None:
+        """Shared circuit breaker for this provider's endpoint, if one is configured."""
+        policy = self.config.circuit_breaker
+        if self._breaker is None and policy is not None:
+            endpoint = getattr(self, "base_url", None) or self.config.base_url or ""
+            self._breaker = get_circuit_breaker(self.name or type(self).__name__, endpoint, policy)
+        return self._breaker
+
+    async def _guarded(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        fallback: Callable[["Provider"], Awaitable[Any]],
+    ) -> Any:
+        """
+        Run ``call`` through the circuit breaker.
+
+        While the circuit is open the call is not made: it goes to the
+        policy's fallback provider, or raises CircuitOpenError.
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await call()
+        policy = breaker.policy
+        if not breaker.allow():
+            if policy.fallback is not None:
+                return await fallback(policy.fallback)
+            raise CircuitOpenError(
+                f"Circuit open for {self.name or type(self).__name__}; "
+                f"retrying after {policy.open_for:g}s"
+            )
+        try:
+            result = await call()
+        except Exception as e:
+            if policy.is_failure(e):
+                breaker.record(failed=True)
+            else:
+                # Bad requests and the caller's deadline say nothing about the endpoint
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record(failed=False)
+        return result
+
+    @property
+    def context_window(self) -> int | None:
+        """Context window in tokens, from the config or the model name."""
+        return self.config.context_window or model_context_window(self.model)
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens locally with this provider family's counter."""
+        return count_tokens(text, self.name, self.model)
+
+    def max_tokens_for(self, prompt: str, contract: OutputContract | None = None) -> int:
+        """
+        Output token budget for one call.
+
+        This is ``max_tokens``, or with ``contract_max_tokens`` a budget sized
+        to a contract whose fields all have size limits. It never exceeds the
+        room the prompt leaves in the context window.
+        """
+        if not self.config.auto_max_tokens:
+            return self.config.max_tokens
+        wanted = self._wanted_tokens(contract)
+        window = self.context_window
+        if window is None:
+            return wanted
+        return max(1, min(wanted, window - self.count_tokens(prompt)))
+
+    def _contract_budget(self, contract: OutputContract | None) -> int | None:
+        """Output tokens sized to a bounded contract, when contract_max_tokens applies."""
+        if (
+            contract is None
+            or not self.config.contract_max_tokens
+            # Reasoning comes out of the same budget as the answer
+            or is_reasoning_model(self.model)
+        ):
+            return None
+        return estimate_output_tokens(contract)
+
+    def _wanted_tokens(self, contract: OutputContract | None) -> int:
+        """Output tokens a call asks for before the context window is considered."""
+        return self._contract_budget(contract) or self.config.max_tokens
+
+    def preflight(self, prompt: str, contract: OutputContract | None = None) -> str:
+        """
+        Check that a prompt fits the context window before sending it.
+
+        A prompt must leave room for at least a short answer. Longer prompts
+        raise PromptTooLongError, or with ``truncate_prompts`` are cut down so
+        the full output budget fits.
+        """
+        window = self.context_window
+        if window is None or not self.config.auto_max_tokens:
+            return prompt
+        wanted = self._wanted_tokens(contract)
+        tokens = self.count_tokens(prompt)
+        if tokens + min(wanted, 256, window // 2) <= window:
+            return prompt
+        if not self.config.truncate_prompts:
+            raise PromptTooLongError(
+                f"Prompt is about {tokens} tokens; {self.model} has a {window}-token context window"
+            )
+        return self._truncate(prompt, max(window - wanted, 1))
+
+    def _truncate(self, prompt: str, limit: int) -> str:
+        """
+        Shorten a prompt to ``limit`` tokens.
+
+        For assembled prompts the longest user segment (usually context) is
+        cut, so instructions and the question survive.
+        """
+        segments = getattr(prompt, "segments", None)
+        user = [i for i, segment in enumerate(segments or ()) if segment.role != "system"]
+        if not segments or not user:
+            return truncate_to_fit(prompt, limit, self.count_tokens)
+        index = max(user, key=lambda i: len(segments[i].text))
+        segment = segments[index]
+        target = self.count_tokens(segment.text) - (self.count_tokens(prompt) - limit)
+        shortened = dataclasses.replace(
+            segment, text=truncate_to_fit(segment.text, max(target, 0), self.count_tokens)
+        )
+        truncated = Prompt([*segments[:index], shortened, *segments[index + 1 :]])
+        if self.count_tokens(truncated) > limit:
+            return truncate_to_fit(truncated, limit, self.count_tokens)
+        return truncated
+
+    async def _throttle(self, prompt: str, contract: OutputContract | None = None) -> None:
+        """Wait for room under the rate limits for one request with this prompt."""
+        limiter = self.rate_limiter
+        if limiter is not None:
+            # Providers count the max_tokens reservation against the token budget
+            await limiter.acquire(self.count_tokens(prompt) + self.max_tokens_for(prompt, contract))
+
+    async def _limited_complete(self, prompt: str, contract: OutputContract | None) -> str:
+        await self._throttle(prompt, contract)
+        return await self._complete(prompt, contract)
+
+    async def complete(
+        self,
+        prompt: str,
+        contract: OutputContract | None = None,
+        action: str | None = None,
+    ) -> Completion:
+        """
+        Send a prompt and get a completion.
+
+        Args:
+            prompt: Prompt text
+            contract: Output contract the response must satisfy, if any. The
+                prompt already carries the contract's instructions; providers
+                may also use it to constrain generation.
+            action: AILANG action the prompt was built from (e.g. "code"),
+                used by routing providers
+
+        Returns:
+            Response text, with the call's usage, latency, model and provider
+        """
+        prompt = self.preflight(prompt, contract)
+        start = time.monotonic()
+
+        def call() -> Awaitable[Any]:
+            return self._guarded(
+                lambda: within_deadline(
+                    self.config.retry.call(self._limited_complete, prompt, contract)
+                ),
+                lambda fallback: fallback.complete(prompt, contract, action),
+            )
+
+        if not self.config.coalesce:
+            text = await call()
+        else:
+            text, shared = await within_deadline(
+                self._coalescer.run(self._coalesce_key(prompt, contract), call)
+            )
+            if shared:
+                # Usage belongs to the caller whose call was made, so it is counted once
+                text = Completion(
+                    text,
+                    model=getattr(text, "model", ""),
+                    provider=getattr(text, "provider", ""),
+                )
+        return self._completion(text, time.monotonic() - start)
+
+    def _coalesce_key(self, prompt: str, contract: OutputContract | None) -> tuple[Any, ...]:
+        """Calls with equal keys would send the same request upstream."""
+        return (
+            self.name,
+            self.model,
+            self.config.temperature,
+            self.config.max_tokens,
+            self.config.structured_output,
+            contract.to_prompt_instructions() if contract else None,
+            str(prompt),
+        )
+
+    def _completion(self, text: str, latency: float) -> Completion:
+        """Attach this provider's model and name, and the call latency, to a response."""
+        if not isinstance(text, Completion):
+            text = Completion(text)
+        text.model = text.model or self.model
+        text.provider = text.provider or self.name
+        text.latency = latency
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        action: str | None = None,
+        on_complete: Callable[[Completion], None] | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Send a prompt and yield the completion as it is generated.
+
+        Failures are retried until the first chunk arrives; after that the
+        error is raised to the caller, since text has already been delivered.
+        Once the stream has finished, ``on_complete`` (if given) receives the
+        whole text as a Completion carrying the stream's usage and latency.
+        """
+        prompt = self.preflight(prompt)
+        start = time.monotonic()
+        texts: list[str] = []
+        usage = Usage()
+        model = ""
+
+        async def open_stream():
+            await self._throttle(prompt)
+            chunks = self._stream(prompt)
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return chunks, None
+            except BaseException:
+                await chunks.aclose()
+                raise
+
+        chunks, chunk = await within_deadline(self.config.retry.call(open_stream))
+        try:
+            while chunk is not None:
+                # Providers report a stream's token counts as a trailing Usage
+                if isinstance(chunk, Usage):
+                    usage = usage + chunk
+                elif chunk:
+                    usage = usage + getattr(chunk, "usage", Usage())
+                    model = getattr(chunk, "model", "") or model
+                    texts.append(chunk)
+                    yield chunk
+                try:
+                    chunk = await within_deadline(chunks.__anext__())
+                except StopAsyncIteration:
+                    chunk = None
+        finally:
+            await chunks.aclose()
+        if on_complete is not None:
+            on_complete(
+                self._completion(
+                    Completion("".join(texts), usage, model=model), time.monotonic() - start
+                )
+            )
+
+    async def complete_with_image(self, prompt: str) -> bytes:
+        """Generate an image from a prompt."""
+
+        async def generate():
+            limiter = self.rate_limiter
+            if limiter is not None:
+                await limiter.acquire()
+            return await self._complete_with_image(prompt)
+
+        return await self._guarded(
+            lambda: within_deadline(self.config.retry.call(generate)),
+            lambda fallback: fallback.complete_with_image(prompt),
+        )
+
+    async def complete_images(self, prompt: str, n: int = 1) -> list[bytes]:
+        """Generate ``n`` image variants of a prompt concurrently."""
+        return await _gather_all([self.complete_with_image(prompt) for _ in range(n)])
+
+    # Whether ``_complete_samples`` returns several candidates from one request
+    supports_samples = False
+
+    async def complete_samples(
+        self,
+        prompt: str,
+        contract: OutputContract | None = None,
+        n: int = 2,
+        action: str | None = None,
+    ) -> list[Completion]:
+        """
+        Get ``n`` candidate completions for one prompt.
+
+        Providers that can sample several choices in one request
+        (OpenAI-compatible servers) do so in a single round trip; others make
+        ``n`` concurrent calls. The request's usage is reported on the first
+        candidate only, so it is counted once.
+        """
+        if n <= 1 or not self.supports_samples:
+            return await _gather_all([self.complete(prompt, contract, action) for _ in range(n)])
+
+        prompt = self.preflight(prompt, contract)
+        start = time.monotonic()
+
+        async def sample() -> list[str]:
+            await self._throttle(prompt, contract)
+            return await self._complete_samples(prompt, contract, n)
+
+        texts = await self._guarded(
+            lambda: within_deadline(self.config.retry.call(sample)),
+            lambda fallback: fallback.complete_samples(prompt, contract, n, action),
+        )
+        latency = time.monotonic() - start
+        return [self._completion(text, latency) for text in texts]
+
+    # Probe prompt for warm_up: short to send and to answer
+    WARM_UP_PROMPT = "Reply with OK."
+
+    async def warm_up(self, probe: bool = False) -> None:
+        """
+        Get ready for the first call ahead of traffic.
+
+        Builds the client and opens a pooled connection with a cheap request
+        (DNS, TLS handshake; for Ollama, loading the model). With ``probe``, a
+        tiny completion is also sent, exercising the whole request path.
+        """
+        await within_deadline(self.config.retry.call(self._warm_up))
+        if probe:
+            await self.complete(self.WARM_UP_PROMPT)
+
+    async def _warm_up(self) -> None:
+        """Provider-specific warm-up request; providers without one do nothing."""
+
+    async def complete_batch(
+        self, prompts: list[str], contract: OutputContract | None = None
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Complete many prompts as one offline job, yielding results as they finish.
+
+        Providers with a native batch API submit a single job; others complete
+        the prompts concurrently. Failed prompts yield a BatchResult carrying
+        the error.
+        """
+
+        async def complete(prompt: str) -> str:
+            return await self.complete(prompt, contract)
+
+        async for result in bounded_map(
+            complete, prompts, self.config.batch_concurrency, ordered=False
+        ):
+            yield result
 
     @abstractmethod
-    async def complete(self, prompt: str) -> str:
-        """Send a prompt and get a completion."""
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        """Provider-specific completion call."""
         pass
 
+    async def _stream(self, prompt: str) -> AsyncIterator[str | Usage]:
+        """
+        Provider-specific streaming call.
+
+        Yields text chunks, then optionally a Usage with the stream's token
+        counts. Providers without native streaming yield the full completion
+        at once.
+        """
+        yield await self._complete(prompt)
+
+    async def _complete_samples(
+        self, prompt: str, contract: OutputContract | None, n: int
+    ) -> list[str]:
+        """Provider-specific call returning ``n`` candidates (with ``supports_samples``)."""
+        raise NotImplementedError
+
     @abstractmethod
-    async def complete_with_image(self, prompt: str) -> bytes:
-        """Generate an image from a prompt."""
+    async def _complete_with_image(self, prompt: str) -> bytes:
+        """Provider-specific image generation call."""
         pass
 
 
 class OpenAIProvider(Provider):
     """OpenAI API provider (GPT-5.2, GPT-5.2-Codex, DALL-E)."""
 
+    name = "openai"
+
     def __init__(self, config: ProviderConfig):
         super().__init__(config)
+        self.client = self._build_client()
+        self.model = config.model or "gpt-5.2"
+
+    def _build_client(self) -> Any:
         try:
             from openai import AsyncOpenAI
-
-            self.client = AsyncOpenAI(
-                api_key=config.api_key,
-                base_url=config.base_url,
-            )
         except ImportError:
             raise ImportError("OpenAI package required: pip install openai")
 
-        self.model = config.model or "gpt-5.2"
+        # Retries are handled by the provider's RetryPolicy
+        return AsyncOpenAI(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url,
+            max_retries=0,
+            timeout=self.config.request_timeout,
+        )
 
-    async def complete(self, prompt: str) -> str:
+    # Model families that accept response_format json_schema with strict: true
+    STRUCTURED_OUTPUT_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+    STRUCTURED_OUTPUT_EXCLUDED = ("gpt-4o-2024-05-13", "o1-mini", "o1-preview")
+
+    @property
+    def supports_structured_output(self) -> bool:
+        """Whether contracts are sent as a strict JSON schema."""
+        if self.config.structured_output is not None:
+            return self.config.structured_output
+        model = self.model.lower()
+        return model.startswith(self.STRUCTURED_OUTPUT_MODELS) and not model.startswith(
+            self.STRUCTURED_OUTPUT_EXCLUDED
+        )
+
+    def _chat_params(self, prompt: str, contract: OutputContract | None = None) -> dict[str, Any]:
+        """Chat completion request body for a prompt."""
+        params: dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.config.temperature,
+            "max_tokens": self.max_tokens_for(prompt, contract),
+        }
+        if contract is not None and self.supports_structured_output:
+            params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "output",
+                    "strict": True,
+                    "schema": contract.to_json_schema(strict=True),
+                },
+            }
+        return params
+
+    def _record_usage(self, usage: dict[str, Any] | None) -> Usage:
+        """Add the token counts from a response's ``usage`` object and return them."""
+        if not usage:
+            return Usage()
+        details = usage.get("prompt_tokens_details") or {}
+        counted = Usage(
+            prompt_tokens=usage.get("prompt_tokens") or 0,
+            completion_tokens=usage.get("completion_tokens") or 0,
+            cached_tokens=details.get("cached_tokens") or 0,
+        )
+        self.usage = self.usage + counted
+        return counted
+
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        response = await self.client.chat.completions.create(**self._chat_params(prompt, contract))
+        usage = self._record_usage(response.usage.model_dump() if response.usage else None)
+        message = response.choices[0].message
+        if getattr(message, "refusal", None):
+            raise ContractError(f"Model refused to answer: {message.refusal}")
+        return Completion(message.content or "", usage, model=response.model)
+
+    async def _warm_up(self) -> None:
+        # Listing models is cheap, authenticated and served by compatible servers too
+        await self.client.models.list()
+
+    # OpenAI-compatible servers (vLLM, LM Studio...) sample n choices per request
+    supports_samples = True
+
+    async def _complete_samples(
+        self, prompt: str, contract: OutputContract | None, n: int
+    ) -> list[str]:
         response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
+            **self._chat_params(prompt, contract), n=n
         )
-        return response.choices[0].message.content or ""
+        usage = self._record_usage(response.usage.model_dump() if response.usage else None)
+        messages = [
+            choice.message
+            for choice in response.choices
+            if not getattr(choice.message, "refusal", None)
+        ]
+        if not messages:
+            raise ContractError(f"Model refused to answer: {response.choices[0].message.refusal}")
+        return [
+            Completion(message.content or "", usage if i == 0 else None, model=response.model)
+            for i, message in enumerate(messages)
+        ]
 
-    async def complete_with_image(self, prompt: str) -> bytes:
+    async def _stream(self, prompt: str) -> AsyncIterator[str | Usage]:
+        response = await self.client.chat.completions.create(
+            **self._chat_params(prompt),
+            stream=True,
+            # The final chunk then carries the token counts
+            stream_options={"include_usage": True},
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None):
+                yield self._record_usage(chunk.usage.model_dump())
+
+    async def submit_batch(self, prompts: list[str], contract: OutputContract | None = None) -> str:
+        """
+        Upload prompts as a Batch API job.
+
+        Each prompt becomes one ``/v1/chat/completions`` request whose
+        ``custom_id`` is ``request-<index>``. With a contract, each request
+        carries its response schema.
+
+        Returns:
+            Batch ID
+        """
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": f"request-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._chat_params(prompt, contract),
+                }
+            )
+            for i, prompt in enumerate(prompts)
+        ]
+        upload = await self.config.retry.call(
+            self.client.files.create,
+            file=("ailang-batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = await self.config.retry.call(
+            self.client.batches.create,
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def wait_for_batch(self, batch_id: str) -> Any:
+        """Poll a batch until it reaches a terminal status and return it."""
+        while True:
+            batch = await self.config.retry.call(self.client.batches.retrieve, batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                return batch
+            await asyncio.sleep(self.config.batch_poll_interval)
+
+    async def batch_results(self, batch: Any) -> dict[str, str | Exception]:
+        """Read a finished batch's output and error files, keyed by custom_id."""
+        results: dict[str, str | Exception] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.config.retry.call(self.client.files.content, file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    error = record.get("error") or response.get("body", {}).get("error")
+                    results[record["custom_id"]] = RuntimeError(f"Batch request failed: {error}")
+                else:
+                    body = response["body"]
+                    message = body["choices"][0]["message"]
+                    results[record["custom_id"]] = Completion(
+                        message.get("content") or "",
+                        self._record_usage(body.get("usage")),
+                        model=body.get("model", self.model),
+                        provider=self.name,
+                    )
+        return results
+
+    async def complete_batch(
+        self, prompts: list[str], contract: OutputContract | None = None
+    ) -> AsyncIterator[BatchResult]:
+        batch = await self.wait_for_batch(await self.submit_batch(prompts, contract))
+        results = await self.batch_results(batch)
+        for i, prompt in enumerate(prompts):
+            outcome = results.get(
+                f"request-{i}", RuntimeError(f"No result for request {i}: batch {batch.status}")
+            )
+            if isinstance(outcome, Exception):
+                yield BatchResult(i, prompt, error=outcome)
+            else:
+                yield BatchResult(i, prompt, result=outcome)
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
+        # Inline base64 avoids a second request to download the image
         response = await self.client.images.generate(
             model="dall-e-3",
             prompt=prompt,
             size="1024x1024",
             quality="standard",
             n=1,
+            response_format="b64_json",
         )
-
-        # Download image
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = response.data[0].url if response.data else None
-            if not url:
-                raise RuntimeError("No image URL returned")
-            img_response = await client.get(url)
-            return img_response.content
+        data = response.data[0].b64_json if response.data else None
+        if not data:
+            raise RuntimeError("No image data returned")
+        return base64.b64decode(data)
 
 
 class AnthropicProvider(Provider):
     """Anthropic API provider (Claude)."""
 
+    name = "anthropic"
+
     def __init__(self, config: ProviderConfig):
         super().__init__(config)
+        self.client = self._build_client()
+        self.model = config.model or "claude-opus-4.5"
+
+    def _build_client(self) -> Any:
         try:
             from anthropic import AsyncAnthropic
-
-            self.client = AsyncAnthropic(api_key=config.api_key)
         except ImportError:
             raise ImportError("Anthropic package required: pip install anthropic")
 
-        self.model = config.model or "claude-opus-4.5"
+        # Retries are handled by the provider's RetryPolicy
+        return AsyncAnthropic(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url,
+            max_retries=0,
+            timeout=self.config.request_timeout,
+        )
+
+    async def _warm_up(self) -> None:
+        # Older SDKs have no models endpoint; use warm_up(probe=True) with them
+        models = getattr(self.client, "models", None)
+        if models is not None:
+            await models.list(limit=1)
+
+    # Name of the tool a contract call is forced to use
+    CONTRACT_TOOL = "output"
+
+    def _message_params(
+        self, prompt: str, contract: OutputContract | None = None
+    ) -> dict[str, Any]:
+        """Messages API request parameters for a prompt."""
+        params: dict[str, Any] = {
+            "model": self.model,
+            "max_tokens": self.max_tokens_for(prompt, contract),
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        segments = getattr(prompt, "segments", None)
+        if segments and self.config.prompt_caching:
+            system, content = self._cache_blocks(segments)
+            if system:
+                params["system"] = system
+            if content:
+                params["messages"] = [{"role": "user", "content": content}]
+        if contract is not None and self.config.structured_output is not False:
+            # The contract becomes the only tool and the model must call it, so
+            # the answer arrives as structured tool input rather than free text
+            params["tools"] = [
+                {
+                    "name": self.CONTRACT_TOOL,
+                    "description": "Return the response in the required format.",
+                    "input_schema": contract.to_json_schema(),
+                }
+            ]
+            params["tool_choice"] = {"type": "tool", "name": self.CONTRACT_TOOL}
+        return params
+
+    def _cache_blocks(
+        self, segments: tuple[PromptSegment, ...]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Split prompt segments into system and user content blocks with cache breakpoints.
+
+        Standing instructions move to the system prompt, which Anthropic
+        places before the messages, so they form a stable cached prefix even
+        when the question changes. Large cacheable user segments (shared
+        context) get breakpoints of their own. Anthropic allows at most four
+        breakpoints per request.
+        """
+        system = [
+            {"type": "text", "text": segment.text}
+            for segment in segments
+            if segment.role == "system" and segment.text
+        ]
+        user_segments = [s for s in segments if s.role != "system" and s.text]
+        content: list[dict[str, Any]] = [
+            {"type": "text", "text": segment.text} for segment in user_segments
+        ]
+
+        breakpoints = 4
+        if system and any(s.cacheable for s in segments if s.role == "system"):
+            system[-1]["cache_control"] = {"type": "ephemeral"}
+            breakpoints -= 1
+
+        large = [
+            i
+            for i, segment in enumerate(user_segments)
+            if segment.cacheable and len(segment.text) >= self.config.cache_min_chars
+        ]
+        for i in large[-breakpoints:]:
+            content[i]["cache_control"] = {"type": "ephemeral"}
+
+        return system, content
 
-    async def complete(self, prompt: str) -> str:
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=self.config.max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+    def _record_usage(self, message: Any) -> Usage:
+        """Add a response's token counts, including cache reads and writes, and return them."""
+        usage = getattr(message, "usage", None)
+        if usage is None:
+            return Usage()
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        counted = Usage(
+            # input_tokens excludes tokens read from or written to the cache
+            prompt_tokens=(usage.input_tokens or 0) + cached + written,
+            completion_tokens=usage.output_tokens or 0,
+            cached_tokens=cached,
+            cache_write_tokens=written,
         )
-        block = response.content[0]
+        self.usage = self.usage + counted
+        return counted
+
+    def _completion_from(self, message: Any) -> Completion:
+        """Response text of a message, with its token usage."""
+        return Completion(
+            self._message_text(message),
+            self._record_usage(message),
+            model=getattr(message, "model", None) or self.model,
+            provider=self.name,
+        )
+
+    @staticmethod
+    def _message_text(message: Any) -> str:
+        """Response text; a forced contract tool call is returned as its JSON input."""
+        for block in message.content:
+            if getattr(block, "type", None) == "tool_use":
+                return json.dumps(block.input)
+        block = message.content[0]
         return block.text if hasattr(block, "text") else str(block)
 
-    async def complete_with_image(self, prompt: str) -> bytes:
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        response = await self.client.messages.create(**self._message_params(prompt, contract))
+        return self._completion_from(response)
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str | Usage]:
+        async with self.client.messages.stream(**self._message_params(prompt)) as response:
+            async for text in response.text_stream:
+                yield text
+            yield self._record_usage(await response.get_final_message())
+
+    async def submit_batch(self, prompts: list[str], contract: OutputContract | None = None) -> str:
+        """
+        Submit prompts as one Message Batches job.
+
+        Each prompt becomes one request whose ``custom_id`` is ``request-<index>``.
+        With a contract, each request forces the contract tool.
+
+        Returns:
+            Message batch ID
+        """
+        batch = await self.config.retry.call(
+            self.client.messages.batches.create,
+            requests=[
+                {"custom_id": f"request-{i}", "params": self._message_params(prompt, contract)}
+                for i, prompt in enumerate(prompts)
+            ],
+        )
+        return batch.id
+
+    async def wait_for_batch(self, batch_id: str) -> Any:
+        """Poll a message batch until processing has ended and return it."""
+        while True:
+            batch = await self.config.retry.call(self.client.messages.batches.retrieve, batch_id)
+            if batch.processing_status == "ended":
+                return batch
+            await asyncio.sleep(self.config.batch_poll_interval)
+
+    async def batch_results(self, batch_id: str) -> AsyncIterator[tuple[str, str | Exception]]:
+        """Stream ``(custom_id, text or error)`` pairs from an ended message batch."""
+        results = await self.config.retry.call(self.client.messages.batches.results, batch_id)
+        async for entry in results:
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, self._completion_from(entry.result.message)
+            else:
+                error = getattr(entry.result, "error", None) or entry.result.type
+                yield entry.custom_id, RuntimeError(f"Batch request {entry.result.type}: {error}")
+
+    async def complete_batch(
+        self, prompts: list[str], contract: OutputContract | None = None
+    ) -> AsyncIterator[BatchResult]:
+        batch = await self.wait_for_batch(await self.submit_batch(prompts, contract))
+        pending = set(range(len(prompts)))
+        async for custom_id, outcome in self.batch_results(batch.id):
+            index = int(custom_id.removeprefix("request-"))
+            pending.discard(index)
+            if isinstance(outcome, Exception):
+                yield BatchResult(index, prompts[index], error=outcome)
+            else:
+                yield BatchResult(index, prompts[index], result=outcome)
+        for index in sorted(pending):
+            yield BatchResult(index, prompts[index], error=RuntimeError("No result in batch"))
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
         raise NotImplementedError("Anthropic does not support image generation")
 
 
 class OllamaProvider(Provider):
     """Ollama local provider."""
 
+    name = "ollama"
+
     def __init__(self, config: ProviderConfig):
         super().__init__(config)
         self.base_url = config.base_url or "http://localhost:11434"
         self.model = config.model or "llama2"
 
-    async def complete(self, prompt: str) -> str:
-        import httpx
+    @property
+    def context_window(self) -> int | None:
+        # The window is whatever num_ctx the model is loaded with
+        return self.config.context_window or self.config.num_ctx
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                },
-                timeout=120.0,
+    def _generate_body(
+        self, prompt: str, stream: bool, contract: OutputContract | None = None
+    ) -> dict[str, Any]:
+        """/api/generate request body for a prompt."""
+        body: dict[str, Any] = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+        }
+        if self.config.keep_alive is not None:
+            body["keep_alive"] = self.config.keep_alive
+        num_predict = self.config.num_predict
+        if num_predict is None and self._contract_budget(contract) is not None:
+            # Ollama generates until done by default; only contract budgets are sent
+            num_predict = self.max_tokens_for(prompt, contract)
+        options = {
+            key: value
+            for key, value in (
+                ("num_ctx", self.config.num_ctx),
+                ("num_predict", num_predict),
             )
-            return response.json()["response"]
+            if value is not None
+        }
+        if options:
+            body["options"] = options
+        if contract is not None and self.config.structured_output is not False:
+            # Ollama constrains generation to a JSON schema passed as the format
+            body["format"] = contract.to_json_schema()
+        return body
 
-    async def complete_with_image(self, prompt: str) -> bytes:
+    async def _warm_up(self) -> None:
+        # A generate request without a prompt only loads the model, which then
+        # stays resident for keep_alive
+        body = self._generate_body("", stream=False)
+        del body["prompt"]
+        response = await self._http_client().post(
+            f"{self.base_url}/api/generate", json=body, timeout=self.config.request_timeout
+        )
+        response.raise_for_status()
+
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        response = await self._http_client().post(
+            f"{self.base_url}/api/generate",
+            json=self._generate_body(prompt, stream=False, contract=contract),
+            timeout=self.config.request_timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return Completion(data["response"], self._record_usage(data))
+
+    def _record_usage(self, data: dict[str, Any]) -> Usage:
+        """Add the token counts from a response (or final stream chunk) and return them."""
+        counted = Usage(
+            prompt_tokens=data.get("prompt_eval_count") or 0,
+            completion_tokens=data.get("eval_count") or 0,
+        )
+        self.usage = self.usage + counted
+        return counted
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str | Usage]:
+        async with self._http_client().stream(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=self._generate_body(prompt, stream=True),
+            timeout=self.config.request_timeout,
+        ) as response:
+            response.raise_for_status()
+            # Ollama streams newline-delimited JSON objects
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    # The final object carries the token counts
+                    yield self._record_usage(data)
+                    break
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
         raise NotImplementedError("Ollama does not support image generation")
 
 
+def _gemini_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Adapt a contract JSON Schema to Gemini's ``responseSchema`` subset.
+
+    Gemini marks nullable values with ``nullable`` instead of a null branch,
+    rejects ``additionalProperties`` and string length/pattern keywords (those
+    constraints are still checked locally), and needs an item schema for every
+    array.
+    """
+    if "anyOf" in schema:
+        branches = [branch for branch in schema["anyOf"] if branch.get("type") != "null"]
+        if len(branches) == 1:
+            return {**_gemini_schema(branches[0]), "nullable": True}
+    result = {
+        key: value
+        for key, value in schema.items()
+        if key not in ("additionalProperties", "minLength", "maxLength", "pattern")
+    }
+    if "properties" in result:
+        result["properties"] = {
+            name: _gemini_schema(field) for name, field in result["properties"].items()
+        }
+        # Keep fields in contract order
+        result["propertyOrdering"] = list(result["properties"])
+    if "items" in result:
+        result["items"] = _gemini_schema(result["items"])
+    elif result.get("type") == "array":
+        # Untyped lists, as in strict JSON Schema mode
+        result["items"] = {"type": "string"}
+    return result
+
+
 class GoogleProvider(Provider):
     """Google Gemini provider."""
 
+    name = "google"
+
     def __init__(self, config: ProviderConfig):
         super().__init__(config)
         self.api_key = config.api_key
         self.model = config.model or "gemini-3-pro-preview"
 
-    async def complete(self, prompt: str) -> str:
-        import httpx
+    async def _warm_up(self) -> None:
+        response = await self._http_client().get(
+            f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}",
+            params={"key": self.api_key},
+            timeout=self.config.request_timeout,
+        )
+        response.raise_for_status()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent",
-                params={"key": self.api_key},
-                json={
-                    "contents": [{"parts": [{"text": prompt}]}],
-                    "generationConfig": {
-                        "temperature": self.config.temperature,
-                        "maxOutputTokens": self.config.max_tokens,
-                    },
-                },
-            )
-            data = response.json()
-            return data["candidates"][0]["content"]["parts"][0]["text"]
+    def _request_body(self, prompt: str, contract: OutputContract | None = None) -> dict[str, Any]:
+        """generateContent request body for a prompt."""
+        generation_config: dict[str, Any] = {
+            "temperature": self.config.temperature,
+            "maxOutputTokens": self.max_tokens_for(prompt, contract),
+        }
+        if contract is not None and self.config.structured_output is not False:
+            generation_config["responseMimeType"] = "application/json"
+            generation_config["responseSchema"] = _gemini_schema(contract.to_json_schema())
+        return {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": generation_config,
+        }
 
-    async def complete_with_image(self, prompt: str) -> bytes:
+    def _record_usage(self, data: dict[str, Any]) -> Usage:
+        """Add a response's token counts from its usageMetadata and return them."""
+        usage = data.get("usageMetadata")
+        if not usage:
+            return Usage()
+        counted = Usage(
+            prompt_tokens=usage.get("promptTokenCount", 0),
+            # Thinking models bill thoughts as output tokens
+            completion_tokens=usage.get("candidatesTokenCount", 0)
+            + usage.get("thoughtsTokenCount", 0),
+            cached_tokens=usage.get("cachedContentTokenCount", 0),
+        )
+        self.usage = self.usage + counted
+        return counted
+
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        response = await self._http_client().post(
+            f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent",
+            params={"key": self.api_key},
+            json=self._request_body(prompt, contract),
+            timeout=self.config.request_timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return Completion(
+            data["candidates"][0]["content"]["parts"][0]["text"],
+            self._record_usage(data),
+            model=data.get("modelVersion") or self.model,
+        )
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str | Usage]:
+        usage: dict[str, Any] = {}
+        async with self._http_client().stream(
+            "POST",
+            f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent",
+            params={"key": self.api_key, "alt": "sse"},
+            json=self._request_body(prompt),
+            timeout=self.config.request_timeout,
+        ) as response:
+            response.raise_for_status()
+            # Server-sent events: each "data:" line holds a partial response
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[len("data:") :])
+                # Usage totals are cumulative; the last event has the final counts
+                usage = data.get("usageMetadata") or usage
+                for candidate in data.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+        yield self._record_usage({"usageMetadata": usage})
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
         raise NotImplementedError("Use Imagen API for Google image generation")
 
 
+class ReplayProvider(Provider):
+    """
+    Answers from a cassette of recorded exchanges, for offline and load tests.
+
+    With ``replay.record`` set, calls go to that real provider (built from the
+    same config) and are recorded. Otherwise recorded responses are replayed
+    with simulated latency, injected errors and a throughput limit, so the
+    whole run/ask/chain path can be exercised without network access.
+    """
+
+    name = "replay"
+
+    def __init__(self, config: ProviderConfig):
+        super().__init__(config)
+        if config.replay is None:
+            raise ValueError("The replay provider needs a ReplayPolicy (replay=...)")
+        self.policy = config.replay
+        self.cassette = Cassette(self.policy.cassette)
+        self.upstream: Provider | None = None
+        if self.policy.record:
+            self.upstream = get_provider(
+                self.policy.record, dataclasses.replace(config, replay=None)
+            )
+        self.model = self.upstream.model if self.upstream else config.model or "replay"
+        self._random = random.Random(self.policy.seed)
+        rps = self.policy.requests_per_second
+        # Bursts of up to one second's worth of requests, like a real backend
+        self._capacity = TokenBucket(rps * 60, capacity=rps) if rps else None
+
+    async def _warm_up(self) -> None:
+        if self.upstream is not None:
+            await self.upstream._warm_up()
+
+    async def aclose(self) -> None:
+        if self.upstream is not None:
+            await self.upstream.aclose()
+        await super().aclose()
+
+    async def _replay(self, key: str) -> dict[str, Any]:
+        """Look up a recorded exchange and play out the simulated backend."""
+        entry = self.cassette.get(key)
+        if self._capacity is not None:
+            await asyncio.sleep(self._capacity.reserve())
+        error = self.policy.injected_error(self._random)
+        if error is not None:
+            raise error
+        delay = self.policy.sample_latency(entry.get("latency", 0.0), self._random)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return entry
+
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        key = Cassette.key(
+            "complete", prompt, contract.to_prompt_instructions() if contract else None
+        )
+        if self.upstream is None:
+            entry = await self._replay(key)
+            usage = Usage(**entry.get("usage", {}))
+            self.usage = self.usage + usage
+            return Completion(entry["text"], usage, model=entry.get("model", self.model))
+
+        start = time.monotonic()
+        text = await self.upstream._complete(prompt, contract)
+        usage = getattr(text, "usage", Usage())
+        self.usage = self.usage + usage
+        entry = {
+            "key": key,
+            "text": str(text),
+            "model": getattr(text, "model", "") or self.upstream.model,
+            "latency": round(time.monotonic() - start, 4),
+        }
+        if usage_to_dict(usage):
+            entry["usage"] = usage_to_dict(usage)
+        await self.cassette.add(entry)
+        return text
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
+        key = Cassette.key("image", prompt)
+        if self.upstream is None:
+            entry = await self._replay(key)
+            return base64.b64decode(entry["image"])
+
+        start = time.monotonic()
+        data = await self.upstream._complete_with_image(prompt)
+        await self.cassette.add(
+            {
+                "key": key,
+                "image": base64.b64encode(data).decode(),
+                "latency": round(time.monotonic() - start, 4),
+            }
+        )
+        return data
+
+
 PROVIDERS = {
     "openai": OpenAIProvider,
     "anthropic": AnthropicProvider,
@@ -172,6 +1372,7 @@ PROVIDERS = {
     "local": OllamaProvider,
     "google": GoogleProvider,
     "gemini": GoogleProvider,
+    "replay": ReplayProvider,
 }
 
 
@@ -194,3 +1395,79 @@ def get_provider(name: str, config: ProviderConfig) -> Provider:
         raise ValueError(f"Unknown provider: {name}. Available: {list(PROVIDERS.keys())}")
 
     return PROVIDERS[name](config)
+
+
+# =============================================================================
+# Shared provider registry
+# =============================================================================
+
+_SHARED: dict[tuple[str, ...], Provider] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def provider_key(name: str, config: ProviderConfig) -> tuple[str, ...]:
+    """
+    Registry key for a provider: class, model, endpoint and API key hash.
+
+    Remaining settings (temperature, limits, retry policy...) are folded into
+    a fingerprint so instances with different settings are not shared.
+    """
+    name = name.lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {name}. Available: {list(PROVIDERS.keys())}")
+
+    settings = {
+        f.name: getattr(config, f.name)
+        for f in dataclasses.fields(config)
+        if f.name not in ("api_key", "model", "base_url")
+    }
+    return (
+        PROVIDERS[name].__name__,
+        config.model,
+        config.base_url or "",
+        hashlib.sha256(config.api_key.encode()).hexdigest()[:16],
+        hashlib.sha256(repr(sorted(settings.items())).encode()).hexdigest()[:16],
+    )
+
+
+def get_shared_provider(name: str, config: ProviderConfig) -> Provider:
+    """
+    Get a process-wide provider instance, creating it on first use.
+
+    Callers with the same provider, model, base URL, API key and settings
+    receive the same instance, and with it the same pooled clients and rate
+    limiter.
+
+    Args:
+        name: Provider name (openai, anthropic, ollama, google)
+        config: Provider configuration
+
+    Returns:
+        Shared provider instance
+    """
+    key = provider_key(name, config)
+    with _SHARED_LOCK:
+        provider = _SHARED.get(key)
+        if provider is None:
+            provider = _SHARED[key] = get_provider(name, config)
+        return provider
+
+
+def evict_provider(name: str, config: ProviderConfig) -> Provider | None:
+    """
+    Remove a provider from the shared registry.
+
+    The evicted instance is returned, not closed, since other callers may
+    still hold it; the next get_shared_provider() call builds a fresh one.
+    """
+    with _SHARED_LOCK:
+        return _SHARED.pop(provider_key(name, config), None)
+
+
+async def shutdown_providers() -> None:
+    """Close and forget every shared provider (e.g. on application shutdown)."""
+    with _SHARED_LOCK:
+        providers = list(_SHARED.values())
+        _SHARED.clear()
+    for provider in providers:
+        await provider.aclose()
@@ -0,0 +1,143 @@
+"""
+AILANG Rate Limiting - Client-side request and token budgets per provider/model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate_per_minute``.
+
+    Reservations may drive the bucket negative; the caller then waits until
+    the debt is repaid. Reserving is a synchronous operation, so the bucket
+    can be shared by any number of coroutines, event loops and threads.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_minute / 60)
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take ``amount`` tokens and return how long to wait before using them."""
+        # A single request larger than the bucket would otherwise never fit
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens * 60 / self.rate_per_minute
+
+    def available(self) -> float:
+        """Tokens currently available (negative when in debt)."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class RateLimiter:
+    """
+    Enforces requests-per-minute and tokens-per-minute limits.
+
+    Example:
+        limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200_000)
+        await limiter.acquire(tokens=1200)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+    ):
+        self.requests: TokenBucket | None = None
+        self.tokens: TokenBucket | None = None
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+    ) -> None:
+        """Set new limits, keeping buckets whose limit is unchanged."""
+        if requests_per_minute is None:
+            self.requests = None
+        elif self.requests is None or self.requests.rate_per_minute != requests_per_minute:
+            self.requests = TokenBucket(requests_per_minute)
+
+        if tokens_per_minute is None:
+            self.tokens = None
+        elif self.tokens is None or self.tokens.rate_per_minute != tokens_per_minute:
+            self.tokens = TokenBucket(tokens_per_minute)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens; return the wait in seconds."""
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until one request of ``tokens`` tokens fits within the limits."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def headroom(self) -> float:
+        """Fraction of the tightest budget currently available (0.0 - 1.0)."""
+        fractions = [
+            max(0.0, bucket.available()) / bucket.capacity
+            for bucket in (self.requests, self.tokens)
+            if bucket is not None
+        ]
+        return min(fractions, default=1.0)
+
+
+# Process-wide limiters, shared by every provider instance with the same key
+_LIMITERS: dict[tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    model: str,
+    requests_per_minute: int | None = None,
+    tokens_per_minute: int | None = None,
+) -> RateLimiter:
+    """
+    Get the shared rate limiter for a provider and model.
+
+    The most recently requested limits apply to every user of the limiter.
+
+    Args:
+        provider: Provider name
+        model: Model name
+        requests_per_minute: Maximum requests per minute (None for no limit)
+        tokens_per_minute: Maximum estimated tokens per minute (None for no limit)
+
+    Returns:
+        RateLimiter shared across the process
+    """
+    key = (provider, model)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = _LIMITERS[key] = RateLimiter(requests_per_minute, tokens_per_minute)
+        else:
+            limiter.configure(requests_per_minute, tokens_per_minute)
+        return limiter
@@ -0,0 +1,151 @@
+"""
+AILANG Replay - Cassettes of recorded provider exchanges for offline runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import math
+import random
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ailang.usage import Usage
+
+LATENCY_MODES = ("recorded", "none", "fixed", "uniform", "lognormal")
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed call has no recorded exchange."""
+
+    pass
+
+
+@dataclass
+class ReplayPolicy:
+    """
+    Where a ReplayProvider keeps its cassette and how it simulates a backend.
+
+    With ``record`` set to a provider name, calls go to that provider and each
+    exchange is appended to the cassette. Otherwise calls are answered from the
+    cassette, shaped by:
+
+    - ``latency``: "recorded" (the original latency times ``latency_scale``),
+      "none", "fixed" (``latency_mean``), "uniform" (``latency_mean`` plus or
+      minus ``latency_spread``) or "lognormal" (mean ``latency_mean``, shape
+      ``latency_spread``)
+    - ``error_rate``: fraction of calls failing with HTTP ``error_status``
+    - ``requests_per_second``: throughput the simulated backend sustains
+
+    Example:
+        policy = ReplayPolicy("golden.jsonl", latency="lognormal", latency_mean=0.8,
+                              latency_spread=0.5, error_rate=0.02)
+        ai = AILANG(provider="replay", replay=policy)
+    """
+
+    cassette: str
+    record: str | None = None
+    latency: str = "recorded"
+    latency_scale: float = 1.0
+    latency_mean: float = 0.0
+    latency_spread: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    requests_per_second: float | None = None
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown latency mode: {self.latency}. Available: {LATENCY_MODES}")
+
+    def sample_latency(self, recorded: float, rng: random.Random) -> float:
+        """Seconds a replayed call should take."""
+        if self.latency == "recorded":
+            return recorded * self.latency_scale
+        if self.latency == "fixed":
+            return self.latency_mean
+        if self.latency == "uniform":
+            return max(0.0, rng.uniform(-1, 1) * self.latency_spread + self.latency_mean)
+        if self.latency == "lognormal" and self.latency_mean > 0:
+            sigma = self.latency_spread
+            return rng.lognormvariate(math.log(self.latency_mean) - sigma**2 / 2, sigma)
+        return 0.0
+
+    def injected_error(self, rng: random.Random) -> Exception | None:
+        """An HTTP error to fail this call with, drawn at ``error_rate``."""
+        if self.error_rate <= 0 or rng.random() >= self.error_rate:
+            return None
+        import httpx
+
+        request = httpx.Request("POST", "http://replay")
+        response = httpx.Response(self.error_status, request=request)
+        return httpx.HTTPStatusError(
+            f"Injected error {self.error_status}", request=request, response=response
+        )
+
+
+class Cassette:
+    """
+    Recorded exchanges, stored one JSON object per line.
+
+    Exchanges are keyed by a hash of the call kind, prompt and contract, so
+    cassettes stay small and free of prompt text. A key recorded several
+    times replays its responses in turn.
+
+    Example:
+        cassette = Cassette("golden.jsonl")
+        entry = cassette.get(Cassette.key("complete", prompt))
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._next: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    @staticmethod
+    def key(kind: str, prompt: str, contract_instructions: str | None = None) -> str:
+        """Stable key for a call."""
+        payload = json.dumps([kind, str(prompt), contract_instructions])
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> dict[str, Any]:
+        """Next recorded exchange for a key."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recorded exchange for key {key} in {self.path}")
+            index = self._next.get(key, 0)
+            self._next[key] = index + 1
+            return entries[index % len(entries)]
+
+    async def add(self, entry: dict[str, Any]) -> None:
+        """Record an exchange and append it to the cassette file."""
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+        await asyncio.to_thread(self._append, json.dumps(entry, separators=(",", ":")))
+
+    def _append(self, line: str) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def usage_to_dict(usage: Usage) -> dict[str, int]:
+    """Non-zero token counts of a Usage, for compact storage."""
+    return {name: value for name, value in dataclasses.asdict(usage).items() if value}
@@ -0,0 +1,141 @@
+"""
+AILANG Retry - Backoff policy for transient provider failures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+from ailang.deadline import remaining
+
+T = TypeVar("T")
+
+# Rate limits, timeouts, conflicts and server-side failures are worth retrying
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+# Connection-level errors raised by the OpenAI and Anthropic SDKs
+_CONNECTION_ERRORS = {"APIConnectionError", "APITimeoutError"}
+
+
+def status_code(error: BaseException) -> int | None:
+    """Get the HTTP status code carried by a provider error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException) -> float | None:
+    """
+    Get the server-requested delay (in seconds) from a provider error.
+
+    Understands ``retry-after-ms`` and ``retry-after`` as either seconds or an
+    HTTP date.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Check whether an error is a network-level failure (no HTTP response)."""
+    import httpx
+
+    if isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    return any(cls.__name__ in _CONNECTION_ERRORS for cls in type(error).__mro__)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How a provider retries transient failures.
+
+    Delays grow exponentially from ``base_delay`` up to ``max_delay``, with
+    full jitter so concurrent callers don't retry in lockstep. A server's
+    ``Retry-After`` takes precedence over the computed delay. ``budget`` caps
+    the total time one call may spend waiting between attempts.
+
+    Example:
+        policy = RetryPolicy(max_retries=5, base_delay=1.0, budget=30.0)
+        ai = AILANG(provider="openai", retry=policy)
+    """
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    budget: float | None = 60.0
+    retry_on: frozenset[int] = RETRYABLE_STATUS
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Check whether an error is transient and worth retrying."""
+        status = status_code(error)
+        if status is not None:
+            return status in self.retry_on
+        return is_connection_error(error)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier**attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def delay_for(self, error: BaseException, attempt: int) -> float:
+        """Delay before the next attempt, honoring the server's Retry-After."""
+        requested = retry_after(error)
+        if requested is not None:
+            return requested
+        return self.backoff(attempt)
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Await ``fn(*args, **kwargs)``, retrying transient failures.
+
+        The last error is re-raised once retries or the budget run out.
+        """
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.delay_for(e, attempt)
+                if self.budget is not None and waited + delay > self.budget:
+                    raise
+                # Don't sleep into a deadline the next attempt couldn't meet
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                waited += delay
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,534 @@
+"""
+AILANG Routing - Providers that spread calls across several backends.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar, cast
+
+from ailang.contracts import ContractError, OutputContract
+from ailang.deadline import DeadlineExceededError
+from ailang.providers import Provider
+from ailang.usage import Completion, Usage
+
+T = TypeVar("T")
+
+
+async def _stream_with_failover(
+    providers: list[Provider],
+    prompt: str,
+    action: str | None,
+    on_complete: Callable[[Completion], None] | None,
+) -> AsyncIterator[str]:
+    """Stream from the first provider that produces a chunk, trying each in turn."""
+    last_error: Exception | None = None
+    for provider in providers:
+        chunks = cast(AsyncGenerator[str, None], provider.stream(prompt, action, on_complete))
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            last_error = e
+            await chunks.aclose()
+            continue
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+        return
+    assert last_error is not None
+    raise last_error
+
+
+class _CompositeProvider(Provider):
+    """
+    Base for providers that send calls on to several backend providers.
+
+    Subclasses list their ``backends`` and implement ``complete`` and
+    ``stream``; warm-up and closing reach every backend, and image calls try
+    ``candidates()`` in turn.
+    """
+
+    @property
+    def backends(self) -> list[Provider]:
+        """Every provider this one may call."""
+        raise NotImplementedError
+
+    def candidates(self) -> list[Provider]:
+        """Providers to try, in order."""
+        return self.backends
+
+    async def complete_with_image(self, prompt: str) -> bytes:
+        last_error: Exception | None = None
+        for provider in self.candidates():
+            try:
+                return await provider.complete_with_image(prompt)
+            except Exception as e:
+                last_error = e
+        assert last_error is not None
+        raise last_error
+
+    async def _complete(self, prompt: str, contract: OutputContract | None = None) -> str:
+        return await self.complete(prompt, contract)
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
+        return await self.complete_with_image(prompt)
+
+    async def warm_up(self, probe: bool = False) -> None:
+        await asyncio.gather(*(provider.warm_up(probe) for provider in self.backends))
+
+    async def aclose(self) -> None:
+        for provider in self.backends:
+            await provider.aclose()
+
+
+@dataclass
+class HedgePolicy:
+    """
+    When a HedgedProvider fires backup requests.
+
+    A backup is sent once the primary has been slower than the ``percentile``
+    of its recent latencies (or ``hedge_after`` seconds until ``min_samples``
+    latencies have been seen). After ``failover_after`` consecutive primary
+    errors, calls skip the primary for ``failover_cooldown`` seconds.
+    """
+
+    percentile: float = 0.95
+    hedge_after: float = 2.0
+    min_samples: int = 20
+    window: int = 200
+    failover_after: int = 5
+    failover_cooldown: float = 30.0
+
+
+class HedgedProvider(_CompositeProvider):
+    """
+    Sends each prompt to a primary provider, hedging with backups when it is slow.
+
+    The first successful response wins (for contract calls, the first that
+    satisfies the contract); the other in-flight requests are cancelled. If
+    the primary fails, the next backup is tried immediately. When every
+    response fails the contract, the last one is returned as-is, so callers
+    (e.g. ``ask``) can still retry with stricter instructions.
+
+    Example:
+        primary = get_provider("openai", ProviderConfig(api_key=openai_key))
+        backup = get_provider("anthropic", ProviderConfig(api_key=anthropic_key))
+        ai = AILANG(provider=HedgedProvider(primary, [backup]))
+    """
+
+    name = "hedged"
+
+    def __init__(
+        self,
+        primary: Provider,
+        backups: Provider | list[Provider],
+        policy: HedgePolicy | None = None,
+    ):
+        super().__init__(primary.config)
+        self.primary = primary
+        self.backups = backups if isinstance(backups, list) else [backups]
+        self.policy = policy or HedgePolicy()
+        self.model = primary.model
+        self._latencies: deque[float] = deque(maxlen=self.policy.window)
+        self._primary_errors = 0
+        self._failed_over_until = 0.0
+
+    @property
+    def backends(self) -> list[Provider]:
+        return [self.primary, *self.backups]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary before sending a backup request."""
+        if len(self._latencies) < self.policy.min_samples:
+            return self.policy.hedge_after
+        ordered = sorted(self._latencies)
+        return ordered[int(self.policy.percentile * (len(ordered) - 1))]
+
+    def candidates(self) -> list[Provider]:
+        """Providers to try, in order; the primary is skipped while failed over."""
+        if self.backups and time.monotonic() < self._failed_over_until:
+            return list(self.backups)
+        return [self.primary, *self.backups]
+
+    def _record_primary(self, latency: float | None) -> None:
+        """Record a primary outcome: a latency on success, None on error."""
+        if latency is not None:
+            self._latencies.append(latency)
+            self._primary_errors = 0
+            return
+        self._primary_errors += 1
+        if self._primary_errors >= self.policy.failover_after:
+            self._failed_over_until = time.monotonic() + self.policy.failover_cooldown
+            self._primary_errors = 0
+
+    async def complete(
+        self,
+        prompt: str,
+        contract: OutputContract | None = None,
+        action: str | None = None,
+    ) -> Completion:
+        candidates = self.candidates()
+        started: dict[asyncio.Task, tuple[Provider, float]] = {}
+        pending: set[asyncio.Task] = set()
+        last_error: Exception | None = None
+        invalid: Completion | None = None
+
+        def launch() -> None:
+            provider = candidates[len(started)]
+            task = asyncio.ensure_future(provider.complete(prompt, contract, action))
+            started[task] = (provider, time.monotonic())
+            pending.add(task)
+
+        try:
+            launch()
+            while pending:
+                can_hedge = len(started) < len(candidates)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay() if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Primary is slow: hedge with the next candidate
+                    launch()
+                    continue
+
+                pending -= done
+                for task in done:
+                    provider, start = started[task]
+                    try:
+                        text = task.result()
+                    except DeadlineExceededError:
+                        # The budget is shared; no backup can finish in time
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        if provider is self.primary:
+                            self._record_primary(None)
+                        continue
+                    if contract is not None:
+                        try:
+                            contract.parse_response(text)
+                        except ContractError:
+                            # Kept in case no other response does better
+                            invalid = text
+                            continue
+                    if provider is self.primary:
+                        self._record_primary(time.monotonic() - start)
+                    return text
+
+                # Everything that finished failed: fail over right away
+                if not pending and len(started) < len(candidates):
+                    launch()
+        finally:
+            for task in pending:
+                provider, start = started[task]
+                if provider is self.primary:
+                    # Lost the race; its latency was at least this long
+                    self._latencies.append(time.monotonic() - start)
+                task.cancel()
+
+        if invalid is not None:
+            return invalid
+        assert last_error is not None
+        raise last_error
+
+    async def stream(
+        self,
+        prompt: str,
+        action: str | None = None,
+        on_complete: Callable[[Completion], None] | None = None,
+    ) -> AsyncIterator[str]:
+        # Streams can't be raced without duplicating output, so fail over
+        # only until the first chunk arrives
+        async for chunk in _stream_with_failover(self.candidates(), prompt, action, on_complete):
+            yield chunk
+
+
+@dataclass
+class Route:
+    """A backend for RouterProvider, with its relative weight and price."""
+
+    provider: Provider
+    weight: float = 1.0
+    cost_per_1k_tokens: float = 0.0
+
+
+@dataclass
+class RouteStats:
+    """Observed behaviour of one backend (exponentially weighted)."""
+
+    latency: float | None = None
+    error_rate: float = 0.0
+    in_flight: int = 0
+
+    def record(self, latency: float | None, smoothing: float) -> None:
+        """Fold in one call: its latency on success, None on error."""
+        failed = latency is None
+        self.error_rate += smoothing * (float(failed) - self.error_rate)
+        if latency is not None:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += smoothing * (latency - self.latency)
+
+
+@dataclass
+class RoutingWeights:
+    """
+    How much each signal counts when RouterProvider scores backends.
+
+    Scores are in "seconds-equivalent": a backend's score is its expected
+    latency plus penalties for errors, rate-limit pressure, load and cost.
+    """
+
+    latency: float = 1.0
+    errors: float = 10.0
+    headroom: float = 2.0
+    load: float = 0.5
+    cost: float = 1.0
+    smoothing: float = 0.2
+
+
+class RouterProvider(_CompositeProvider):
+    """
+    Routes each call to the best of several backends.
+
+    Backends are scored by observed latency, error rate, remaining rate-limit
+    headroom, in-flight load and per-token cost, divided by the route's
+    weight; the lowest score wins. ``pins`` restricts specific actions to
+    named backends. If the chosen backend fails, the next best is tried.
+
+    Example:
+        router = RouterProvider(
+            {
+                "openai": Route(openai_provider, cost_per_1k_tokens=0.01),
+                "claude": Route(anthropic_provider, cost_per_1k_tokens=0.015),
+                "local": Route(ollama_provider, weight=2.0),
+            },
+            pins={"code": "claude", "fix": "claude", "summarize": ["local", "openai"]},
+        )
+        ai = AILANG(provider=router)
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        routes: dict[str, Route | Provider],
+        pins: dict[str, str | list[str]] | None = None,
+        weights: RoutingWeights | None = None,
+    ):
+        if not routes:
+            raise ValueError("RouterProvider needs at least one route")
+        self.routes = {
+            name: route if isinstance(route, Route) else Route(route)
+            for name, route in routes.items()
+        }
+        first = next(iter(self.routes.values())).provider
+        super().__init__(first.config)
+        self.model = first.model
+        self.pins = {
+            action: [names] if isinstance(names, str) else list(names)
+            for action, names in (pins or {}).items()
+        }
+        for names in self.pins.values():
+            for name in names:
+                if name not in self.routes:
+                    raise ValueError(f"Unknown route in pins: {name}")
+        self.weights = weights or RoutingWeights()
+        self.stats = {name: RouteStats() for name in self.routes}
+
+    @property
+    def backends(self) -> list[Provider]:
+        return [route.provider for route in self.routes.values()]
+
+    def score(self, name: str) -> float:
+        """Score a backend; lower is better."""
+        route = self.routes[name]
+        stats = self.stats[name]
+        weights = self.weights
+
+        # Unmeasured backends look instantly fast, so each gets tried
+        latency = stats.latency if stats.latency is not None else 0.0
+
+        limiter = route.provider.rate_limiter
+        headroom = limiter.headroom() if limiter is not None else 1.0
+
+        score = (
+            weights.latency * latency
+            + weights.errors * stats.error_rate
+            + weights.headroom * (1.0 - headroom)
+            + weights.load * stats.in_flight
+            + weights.cost * route.cost_per_1k_tokens
+        )
+        return score / route.weight
+
+    def ranked(self, action: str | None = None) -> list[str]:
+        """Backend names to try for an action, best first."""
+        names = self.pins.get(action, list(self.routes)) if action else list(self.routes)
+        return sorted(names, key=self.score)
+
+    async def _routed(self, action: str | None, call: Callable[[Provider], Awaitable[T]]) -> T:
+        last_error: Exception | None = None
+        for name in self.ranked(action):
+            stats = self.stats[name]
+            stats.in_flight += 1
+            start = time.monotonic()
+            try:
+                result = await call(self.routes[name].provider)
+            except DeadlineExceededError:
+                raise
+            except Exception as e:
+                stats.record(None, self.weights.smoothing)
+                last_error = e
+                continue
+            finally:
+                stats.in_flight -= 1
+            stats.record(time.monotonic() - start, self.weights.smoothing)
+            return result
+        assert last_error is not None
+        raise last_error
+
+    async def complete(
+        self,
+        prompt: str,
+        contract: OutputContract | None = None,
+        action: str | None = None,
+    ) -> Completion:
+        return await self._routed(
+            action, lambda provider: provider.complete(prompt, contract, action)
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        action: str | None = None,
+        on_complete: Callable[[Completion], None] | None = None,
+    ) -> AsyncIterator[str]:
+        providers = [self.routes[name].provider for name in self.ranked(action)]
+        async for chunk in _stream_with_failover(providers, prompt, action, on_complete):
+            yield chunk
+
+    async def complete_with_image(self, prompt: str) -> bytes:
+        return await self._routed(None, lambda provider: provider.complete_with_image(prompt))
+
+
+@dataclass
+class CascadePolicy:
+    """
+    When a CascadeProvider escalates a contract call to the next provider.
+
+    A response is accepted when it satisfies the contract, its
+    ``confidence_field`` (if the contract has one) is at least
+    ``min_confidence``, and ``accept`` (if given) returns True for the
+    parsed data. Provider errors escalate too.
+    """
+
+    confidence_field: str | None = "confidence"
+    min_confidence: float = 0.0
+    accept: Callable[[dict[str, Any]], bool] | None = None
+
+
+class CascadeProvider(_CompositeProvider):
+    """
+    Tries providers from cheapest to strongest, escalating only when needed.
+
+    Contract calls go to the first provider; if its response fails the
+    contract or the policy's confidence check, the next provider is asked,
+    and so on. The last provider's response is returned as-is, so callers
+    (e.g. ``ask``) still see contract errors. Calls without a contract are
+    answered by the first provider that succeeds. Usage from every provider
+    that was asked is added up on the returned completion, whose ``parts``
+    keep each provider's call so the ledger prices it at its own model.
+
+    Example:
+        cascade = CascadeProvider(
+            [get_provider("ollama", ollama_config), get_provider("openai", openai_config)],
+            CascadePolicy(min_confidence=0.7),
+        )
+        ai = AILANG(provider=cascade)
+    """
+
+    name = "cascade"
+
+    def __init__(self, providers: list[Provider], policy: CascadePolicy | None = None):
+        if not providers:
+            raise ValueError("CascadeProvider needs at least one provider")
+        super().__init__(providers[0].config)
+        self.providers = providers
+        self.policy = policy or CascadePolicy()
+        self.model = providers[0].model
+        # How many calls each provider answered, cheapest first
+        self.answered = [0] * len(providers)
+
+    @property
+    def backends(self) -> list[Provider]:
+        return self.providers
+
+    def accepts(self, response: str, contract: OutputContract) -> bool:
+        """Whether a response is good enough to stop escalating."""
+        try:
+            data = contract.parse_response(response)
+        except ContractError:
+            return False
+        field = self.policy.confidence_field
+        confidence = data.get(field) if field else None
+        if isinstance(confidence, (int, float)) and confidence < self.policy.min_confidence:
+            return False
+        return self.policy.accept is None or self.policy.accept(data)
+
+    async def complete(
+        self,
+        prompt: str,
+        contract: OutputContract | None = None,
+        action: str | None = None,
+    ) -> Completion:
+        start = time.monotonic()
+        asked: list[Completion] = []
+        for index, provider in enumerate(self.providers[:-1]):
+            try:
+                text = await provider.complete(prompt, contract, action)
+            except DeadlineExceededError:
+                raise
+            except Exception:
+                continue
+            asked.append(text)
+            if contract is None or self.accepts(text, contract):
+                return self._answer(index, asked, start)
+
+        # The strongest provider's answer stands, valid or not
+        asked.append(await self.providers[-1].complete(prompt, contract, action))
+        return self._answer(len(self.providers) - 1, asked, start)
+
+    def _answer(self, index: int, asked: list[Completion], start: float) -> Completion:
+        """Count which provider answered and combine the calls made along the way."""
+        self.answered[index] += 1
+        text = asked[-1]
+        return Completion(
+            text,
+            sum((call.usage for call in asked), Usage()),
+            model=text.model,
+            provider=text.provider,
+            latency=time.monotonic() - start,
+            parts=asked if len(asked) > 1 else None,
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        action: str | None = None,
+        on_complete: Callable[[Completion], None] | None = None,
+    ) -> AsyncIterator[str]:
+        # Streamed text can't be validated before it is delivered
+        async for chunk in _stream_with_failover(self.providers, prompt, action, on_complete):
+            yield chunk
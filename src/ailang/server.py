@@ -2,14 +2,22 @@
 AILANG API Server - FastAPI-based REST API.
 """
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from ailang.breaker import CircuitOpenError
 from ailang.core import AILANG
+from ailang.deadline import DeadlineExceededError
 from ailang.parser import parse, validate
+from ailang.providers import shutdown_providers
+from ailang.retry import RetryPolicy, status_code
 from ailang.transpiler import to_ailang, transpile
 
 
@@ -21,6 +29,7 @@ class RunRequest(BaseModel):
     provider: str | None = None
     model: str | None = None
     api_key: str | None = None
+    timeout: float | None = None
 
 
 class RunResponse(BaseModel):
@@ -58,20 +67,59 @@ class ReverseResponse(BaseModel):
     command: str
 
 
-def create_app(default_provider: str = "openai") -> FastAPI:
+async def _warm_up_target(target: str, probe: bool) -> str:
+    """Warm up one "provider" or "provider:model" target and report the outcome."""
+    provider, _, model = target.partition(":")
+    try:
+        # Same settings as /run, so requests get the warmed shared provider
+        await AILANG(provider=provider, model=model or None).warm_up(probe)
+    except Exception as e:
+        return f"failed: {e}"
+    return "ok"
+
+
+def create_app(
+    default_provider: str = "openai",
+    warm_up: list[str] | None = None,
+    probe: bool = False,
+) -> FastAPI:
     """
     Create the FastAPI application.
 
     Args:
         default_provider: Default AI provider
+        warm_up: "provider" or "provider:model" targets to warm up at startup;
+            /health reports 503 until they are done
+        probe: Send a tiny completion to each warm-up target
 
     Returns:
         FastAPI application
     """
+    targets = warm_up or []
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        app.state.ready = not targets
+        app.state.warm_up = {}
+
+        async def warm() -> None:
+            outcomes = await asyncio.gather(*(_warm_up_target(target, probe) for target in targets))
+            app.state.warm_up = dict(zip(targets, outcomes))
+            app.state.ready = True
+
+        # Start serving right away; /health tells load balancers when to send traffic
+        task = asyncio.create_task(warm()) if targets else None
+        yield
+        if task is not None:
+            task.cancel()
+        # Requests share provider clients; close their connections on exit
+        await shutdown_providers()
+
     app = FastAPI(
         title="AILANG API",
         description="A structured language for human-AI communication",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # CORS
@@ -94,7 +142,12 @@ def create_app(default_provider: str = "openai") -> FastAPI:
 
     @app.get("/health")
     async def health():
-        """Health check."""
+        """Health check; 503 until startup warm-up has finished."""
+        # State is only set by the lifespan, which e.g. a bare TestClient doesn't run
+        if not getattr(app.state, "ready", not targets):
+            return JSONResponse({"status": "warming_up"}, status_code=503)
+        if targets:
+            return {"status": "ok", "warm_up": getattr(app.state, "warm_up", {})}
         return {"status": "ok"}
 
     @app.post("/run", response_model=RunResponse)
@@ -118,7 +171,7 @@ def create_app(default_provider: str = "openai") -> FastAPI:
                 api_key=request.api_key,
             )
             prompt = ai.transpile_only(request.command, **request.variables)
-            result = await ai.run_async(request.command, **request.variables)
+            result = await ai.run_with(request.command, request.variables, request.timeout)
 
             return RunResponse(
                 result=result,
@@ -127,7 +180,14 @@ def create_app(default_provider: str = "openai") -> FastAPI:
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
+        except DeadlineExceededError as e:
+            raise HTTPException(status_code=504, detail=str(e))
         except Exception as e:
+            # Upstream rate limits and outages that outlasted our retries
+            if status_code(e) == 429:
+                raise HTTPException(status_code=429, detail=str(e))
+            if isinstance(e, CircuitOpenError) or RetryPolicy().is_retryable(e):
+                raise HTTPException(status_code=503, detail=str(e))
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.post("/transpile", response_model=TranspileResponse)
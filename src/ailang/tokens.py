@@ -0,0 +1,184 @@
+"""
+AILANG Tokens - Local token counting, context windows and output sizing.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import threading
+from collections.abc import Callable
+
+from ailang.contracts import (
+    Bool,
+    Enum_,
+    Float,
+    Int,
+    List_,
+    Optional_,
+    OutputContract,
+    Str,
+    TypeConstraint,
+)
+
+# A token counter takes (text, model) and returns the number of tokens
+TokenCounter = Callable[[str, str], int]
+
+# Context window sizes in tokens, matched by longest model-name prefix
+CONTEXT_WINDOWS: dict[str, int] = {
+    "gpt-5": 400_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4": 200_000,
+    "claude": 200_000,
+    "gemini": 1_048_576,
+}
+
+# Models that think before answering; their hidden reasoning counts against
+# the output budget, so it is never sized down to the visible answer
+REASONING_MODELS = (
+    "o1",
+    "o3",
+    "o4",
+    "gpt-5",
+    "gemini-2.5",
+    "gemini-3",
+    "deepseek-r1",
+    "deepseek-reasoner",
+    "qwq",
+    "qwen3",
+    "magistral",
+)
+
+# Output tokens allowed for a number or boolean value
+_NUMBER_TOKENS = 8
+
+
+class PromptTooLongError(ValueError):
+    """Raised when a prompt doesn't fit in the model's context window."""
+
+    pass
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Rough token count from the text length (about four characters per token)."""
+    return int(len(text) / chars_per_token) + 1
+
+
+@functools.lru_cache(maxsize=16)
+def _tiktoken_encoding(model: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Unknown or newer models use the current OpenAI encoding
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _openai_tokens(text: str, model: str) -> int:
+    """Exact count with tiktoken when installed, else the heuristic."""
+    try:
+        encoding = _tiktoken_encoding(model)
+    except ImportError:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _dense_tokens(text: str, model: str) -> int:
+    # Claude's tokenizer yields more tokens per character than OpenAI's
+    return estimate_tokens(text, chars_per_token=3.5)
+
+
+_COUNTERS: dict[str, TokenCounter] = {
+    "openai": _openai_tokens,
+    "anthropic": _dense_tokens,
+}
+_COUNTERS_LOCK = threading.Lock()
+
+
+def register_token_counter(family: str, counter: TokenCounter) -> None:
+    """
+    Use ``counter`` for every provider named ``family`` (e.g. "anthropic").
+
+    Example:
+        register_token_counter("ollama", lambda text, model: len(my_tokenizer(text)))
+    """
+    with _COUNTERS_LOCK:
+        _COUNTERS[family] = counter
+
+
+def count_tokens(text: str, family: str = "", model: str = "") -> int:
+    """Count tokens locally with the family's counter, or the heuristic."""
+    counter = _COUNTERS.get(family)
+    if counter is None:
+        return estimate_tokens(text)
+    return counter(text, model)
+
+
+def model_context_window(model: str) -> int | None:
+    """Context window of a known model, or None."""
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model.lower().startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else None
+
+
+def is_reasoning_model(model: str) -> bool:
+    """Whether a model spends output tokens on reasoning before it answers."""
+    return model.lower().startswith(REASONING_MODELS)
+
+
+def _field_tokens(type_constraint: TypeConstraint) -> int | None:
+    """Upper estimate of the output tokens for one value; None if unbounded."""
+    if isinstance(type_constraint, Optional_):
+        return _field_tokens(type_constraint.inner_type)
+    if isinstance(type_constraint, Str):
+        # Count generously: JSON escaping and dense text add tokens
+        return math.ceil(type_constraint.max / 3) + 2 if type_constraint.max else None
+    if isinstance(type_constraint, (Int, Float, Bool)):
+        return _NUMBER_TOKENS
+    if isinstance(type_constraint, Enum_):
+        longest = max((len(choice) for choice in type_constraint.choices), default=0)
+        return math.ceil(longest / 3) + 2
+    if isinstance(type_constraint, List_):
+        items = type_constraint.exact_items or type_constraint.max_items
+        if not items or type_constraint.item_type is None:
+            return None
+        item = _field_tokens(type_constraint.item_type)
+        return None if item is None else items * (item + 2)
+    # Code and anything unknown can be any length
+    return None
+
+
+def estimate_output_tokens(contract: OutputContract) -> int | None:
+    """
+    Generous estimate of the tokens needed to answer with a contract.
+
+    Returns None when a field has no size limit (free text, code, open
+    lists), since the answer could be any length.
+    """
+    total = 2
+    for name, type_constraint in contract.schema.items():
+        value = _field_tokens(type_constraint)
+        if value is None:
+            return None
+        total += estimate_tokens(name) + 4 + value
+    # Headroom so a long-but-valid answer isn't cut off mid-JSON
+    return math.ceil(total * 1.5) + 32
+
+
+def truncate_to_fit(text: str, limit: int, count: Callable[[str], int]) -> str:
+    """Cut ``text`` from the end until it is at most ``limit`` tokens."""
+    marker = "\n[...truncated]"
+    tokens = count(text)
+    while tokens > limit:
+        keep = int(len(text) * limit / tokens * 0.95) - len(marker)
+        if keep <= 0:
+            return ""
+        text = text[:keep] + marker
+        tokens = count(text)
+    return text
@@ -0,0 +1,167 @@
+"""
+AILANG Usage - Token accounting for provider calls.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Usage:
+    """
+    Token counts for one or more provider calls.
+
+    ``prompt_tokens`` includes cached tokens; ``cached_tokens`` are prompt
+    tokens served from the provider's prompt cache and ``cache_write_tokens``
+    those written to it.
+    """
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Fraction of prompt tokens read from the cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def __add__(self, other: Usage) -> Usage:
+        return Usage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+            cache_write_tokens=self.cache_write_tokens + other.cache_write_tokens,
+        )
+
+
+class Completion(str):
+    """
+    Completion text that remembers the call that produced it.
+
+    A Completion is the response string, so callers can use it as-is; the
+    attributes describe the call: token ``usage``, ``latency`` in seconds
+    (retries included), and the ``model`` and ``provider`` that answered.
+    A completion combining several provider calls (a cascade that escalated)
+    lists them in ``parts``, so each is priced at its own model.
+
+    Example:
+        text = await provider.complete("hello")
+        print(text, text.usage.total_tokens, f"{text.latency:.2f}s")
+    """
+
+    usage: Usage
+    model: str
+    provider: str
+    latency: float
+    parts: list[Completion]
+
+    def __new__(
+        cls,
+        text: str,
+        usage: Usage | None = None,
+        model: str = "",
+        provider: str = "",
+        latency: float = 0.0,
+        parts: list[Completion] | None = None,
+    ) -> Completion:
+        completion = super().__new__(cls, text)
+        completion.usage = usage or Usage()
+        completion.model = model
+        completion.provider = provider
+        completion.latency = latency
+        completion.parts = parts or []
+        return completion
+
+
+@dataclass
+class ModelPrice:
+    """
+    Price of a model in USD per million tokens.
+
+    Cached prompt tokens and cache writes are billed at ``input`` unless their
+    own rates are given.
+    """
+
+    input: float
+    output: float
+    cached_input: float | None = None
+    cache_write: float | None = None
+
+    def cost(self, usage: Usage) -> float:
+        """Estimated cost of the given token counts."""
+        cached_rate = self.input if self.cached_input is None else self.cached_input
+        write_rate = self.input if self.cache_write is None else self.cache_write
+        uncached = usage.prompt_tokens - usage.cached_tokens - usage.cache_write_tokens
+        return (
+            max(uncached, 0) * self.input
+            + usage.cached_tokens * cached_rate
+            + usage.cache_write_tokens * write_rate
+            + usage.completion_tokens * self.output
+        ) / 1_000_000
+
+
+@dataclass
+class LedgerEntry:
+    """Totals for a group of calls."""
+
+    calls: int = 0
+    usage: Usage = field(default_factory=Usage)
+    latency: float = 0.0
+    cost: float = 0.0
+
+    def add(self, completion: Completion, cost: float) -> None:
+        self.calls += 1
+        self.usage = self.usage + completion.usage
+        self.latency += completion.latency
+        self.cost += cost
+
+
+class Ledger:
+    """
+    Running token, latency and cost totals, overall and by action and model.
+
+    Costs are estimated from ``prices``, keyed by model name; a key also
+    matches models it is a prefix of (so "gpt-5.2" covers dated snapshots).
+    Models without a price count as free.
+
+    Example:
+        ledger = Ledger({"gpt-5.2": ModelPrice(input=1.25, output=10.0)})
+        ledger.record("summarize", completion)
+        print(ledger.total.cost, ledger.by_action["summarize"].usage)
+    """
+
+    def __init__(self, prices: dict[str, ModelPrice] | None = None):
+        self.prices = dict(prices or {})
+        self._lock = threading.Lock()
+        self.reset()
+
+    def price_for(self, model: str) -> ModelPrice | None:
+        """Price for a model: an exact match, else the longest matching prefix."""
+        if model in self.prices:
+            return self.prices[model]
+        matches = [name for name in self.prices if model.startswith(name)]
+        return self.prices[max(matches, key=len)] if matches else None
+
+    def record(self, action: str | None, completion: Completion) -> None:
+        """Add a completion's usage under its action and model, one entry per part."""
+        for call in completion.parts or [completion]:
+            price = self.price_for(call.model)
+            cost = price.cost(call.usage) if price else 0.0
+            with self._lock:
+                self.total.add(call, cost)
+                self.by_action.setdefault(action or "", LedgerEntry()).add(call, cost)
+                self.by_model.setdefault(call.model, LedgerEntry()).add(call, cost)
+
+    def reset(self) -> None:
+        """Clear all totals."""
+        with self._lock:
+            self.total = LedgerEntry()
+            self.by_action: dict[str, LedgerEntry] = {}
+            self.by_model: dict[str, LedgerEntry] = {}
@@ -0,0 +1,74 @@
+"""
+AILANG Tests - Shared test doubles.
+"""
+
+import asyncio
+from collections.abc import Callable
+
+from ailang.providers import Provider, ProviderConfig
+from ailang.usage import Completion, Usage
+
+
+class FakeProvider(Provider):
+    """
+    In-memory provider for exercising the library without a network.
+
+    ``responses`` is a fixed answer, a list answered in turn, or a callable
+    taking (prompt, contract); without it prompts are echoed back. Every call
+    waits ``delay`` seconds and then raises ``error`` if set. Remaining
+    keyword arguments become the ProviderConfig.
+    """
+
+    def __init__(
+        self,
+        responses: str | list[str] | Callable | None = None,
+        *,
+        config: ProviderConfig | None = None,
+        name: str = "fake",
+        delay: float = 0.0,
+        error: Exception | None = None,
+        usage: Usage | None = None,
+        image: bytes | Callable[[], bytes] = b"",
+        **settings,
+    ):
+        super().__init__(config or ProviderConfig(api_key="", **settings))
+        self.name = name
+        self.model = self.config.model or "test-model"
+        self.responses = responses
+        self.delay = delay
+        self.error = error
+        self.usage_per_call = usage
+        self.image = image
+        self.prompts: list[str] = []
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _call(self) -> None:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+
+    async def _complete(self, prompt: str, contract=None) -> str:
+        self.prompts.append(prompt)
+        await self._call()
+        if self.responses is None:
+            text = prompt
+        elif isinstance(self.responses, str):
+            text = self.responses
+        elif isinstance(self.responses, list):
+            text = self.responses.pop(0)
+        else:
+            text = self.responses(prompt, contract)
+        if self.usage_per_call is not None and not isinstance(text, Completion):
+            return Completion(text, self.usage_per_call)
+        return text
+
+    async def _complete_with_image(self, prompt: str) -> bytes:
+        self.prompts.append(prompt)
+        await self._call()
+        return self.image() if callable(self.image) else self.image
@@ -0,0 +1,353 @@
+"""
+AILANG Tests - Bulk execution tests.
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ailang.batch import bounded_map, collect
+from ailang.contracts import ContractError, int_, str_
+from ailang.core import AILANG
+from tests.fakes import FakeProvider
+
+
+class TestBoundedMap:
+    """Test bounded-concurrency mapping."""
+
+    async def test_limits_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def work(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return item * 2
+
+        results = await collect(bounded_map(work, range(50), concurrency=4))
+        assert [r.result for r in results] == [i * 2 for i in range(50)]
+        assert peak == 4
+
+    async def test_ordered_output(self):
+        async def work(item):
+            await asyncio.sleep(0.001 * (5 - item))
+            return item
+
+        results = [r.index async for r in bounded_map(work, range(5), concurrency=5)]
+        assert results == [0, 1, 2, 3, 4]
+
+    async def test_unordered_output(self):
+        async def work(item):
+            await asyncio.sleep(0.02 * (3 - item))
+            return item
+
+        results = [r.index async for r in bounded_map(work, range(3), concurrency=3, ordered=False)]
+        assert results == [2, 1, 0]
+
+    async def test_errors_do_not_abort(self):
+        async def work(item):
+            if item == 2:
+                raise ValueError("bad row")
+            return item
+
+        results = await collect(bounded_map(work, range(4)))
+        assert [r.ok for r in results] == [True, True, False, True]
+        assert isinstance(results[2].error, ValueError)
+        with pytest.raises(ValueError):
+            results[2].unwrap()
+
+    async def test_lazy_iterables_and_progress(self):
+        seen = []
+
+        async def work(item):
+            return item
+
+        rows = (i for i in range(10))
+        await collect(bounded_map(work, rows, progress=lambda done, total: seen.append(total)))
+        assert seen == [None] * 10
+
+        seen.clear()
+        await collect(bounded_map(work, [1, 2], progress=lambda done, total: seen.append(done)))
+        assert seen == [1, 2]
+
+    async def test_rejects_zero_concurrency(self):
+        async def work(item):
+            return item
+
+        with pytest.raises(ValueError):
+            await collect(bounded_map(work, [1], concurrency=0))
+
+
+class TestBulkAPI:
+    """Test AILANG bulk methods."""
+
+    def make_ai(self):
+        ai = AILANG(provider="ollama")
+        ai._provider = FakeProvider(config=ai.provider_config)
+        return ai
+
+    def test_run_many(self):
+        ai = self.make_ai()
+        results = ai.run_many(['write "a"', 'write "b"'])
+        assert [r.result for r in results] == [
+            ai.transpile_only('write "a"'),
+            ai.transpile_only('write "b"'),
+        ]
+
+    def test_map(self):
+        ai = self.make_ai()
+        results = ai.map("summarize {text}", [{"text": "one"}, {"text": "two"}])
+        assert ["one" in results[0].result, "two" in results[1].result] == [True, True]
+
+    def test_variables_named_like_parameters(self):
+        ai = self.make_ai()
+        results = ai.map("summarize {timeout}", [{"timeout": "the meeting ran late"}])
+        assert "the meeting ran late" in results[0].result
+        results = ai.run_many(["summarize {timeout}"], timeout="notes")
+        assert "notes" in results[0].result
+
+    def test_ask_many_requires_question_for_dicts(self):
+        ai = self.make_ai()
+        results = ai.ask_many([{"text": "x"}], returns={"answer": str_()})
+        assert isinstance(results[0].error, ValueError)
+
+    def test_ask_many_context_named_like_parameters(self):
+        provider = FakeProvider('{"answer": "ok"}')
+        ai = AILANG(provider=provider)
+        results = ai.ask_many(
+            [{"samples": "abc", "vote": "yes"}], question="q", returns={"answer": str_()}
+        )
+        assert results[0].result.answer == "ok"
+        assert "abc" in provider.prompts[0]
+        assert provider.calls == 1
+
+
+class StandInOpenAI(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAI files and batches endpoints."""
+
+    files: dict[str, str] = {}
+    batches: dict[str, dict] = {}
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, payload, content_type="application/json"):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body.encode())))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        if self.path == "/v1/files":
+            # Pull the JSONL requests out of the multipart upload
+            lines = [line for line in body.splitlines() if line.startswith('{"custom_id"')]
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = "\n".join(lines)
+            self.reply({"id": file_id, "object": "file", "purpose": "batch", "bytes": 0})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "status": "in_progress",
+                "input_file_id": request["input_file_id"],
+                "output_file_id": None,
+                "error_file_id": None,
+            }
+            self.reply(self.batches[batch_id])
+
+    def do_GET(self):
+        if self.path.startswith("/v1/batches/"):
+            batch = self.batches[self.path.rsplit("/", 1)[1]]
+            if batch["status"] == "in_progress":
+                # Finish on the second poll
+                batch["status"] = "finalizing"
+            elif batch["status"] == "finalizing":
+                batch.update(status="completed", output_file_id=self.run(batch))
+            self.reply(batch)
+        elif self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+            self.reply(self.files[self.path.split("/")[3]], "application/jsonl")
+
+    def run(self, batch):
+        """Answer each request with a JSON echo of its prompt."""
+        output = []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            prompt = request["body"]["messages"][0]["content"]
+            content = json.dumps({"length": len(prompt)})
+            if "FAIL" in prompt:
+                content = "not json"
+            output.append(
+                {
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": content}}]},
+                    },
+                }
+            )
+        output_id = f"file-{len(self.files)}"
+        self.files[output_id] = "\n".join(json.dumps(record) for record in reversed(output))
+        return output_id
+
+
+def serve(handler):
+    """Run a stand-in server on a free local port, yielding its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def openai_stand_in():
+    for url in serve(StandInOpenAI):
+        yield f"{url}/v1"
+
+
+class TestOpenAIBatch:
+    """Test OpenAI Batch API mode against a local stand-in server."""
+
+    def test_ask_batch(self, openai_stand_in):
+        ai = AILANG(
+            provider="openai", api_key="test", base_url=openai_stand_in, batch_poll_interval=0
+        )
+        results = ai.ask_batch(
+            ["short", "a much longer question", "FAIL"],
+            returns={"length": int_()},
+        )
+        assert [r.index for r in results] == [0, 1, 2]
+        assert results[0].ok and results[1].ok
+        assert results[0].result.length < results[1].result.length
+        assert isinstance(results[2].error, ContractError)
+
+    def test_run_batch(self, openai_stand_in):
+        ai = AILANG(
+            provider="openai", api_key="test", base_url=openai_stand_in, batch_poll_interval=0
+        )
+        seen = []
+        results = ai.run_batch(['write "a"', 'write "b"'], progress=lambda *p: seen.append(p))
+        assert all(r.ok for r in results)
+        assert [r.input for r in results] == ['write "a"', 'write "b"']
+        assert seen == [(1, 2), (2, 2)]
+
+
+class StandInAnthropic(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Anthropic Message Batches endpoints."""
+
+    batches: dict[str, dict] = {}
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body.encode())))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def batch(self, batch_id):
+        record = self.batches[batch_id]
+        host = f"http://{self.headers['Host']}"
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": record["status"],
+            "results_url": (
+                f"{host}/v1/messages/batches/{batch_id}/results"
+                if record["status"] == "ended"
+                else None
+            ),
+        }
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        batch_id = f"msgbatch-{len(self.batches)}"
+        self.batches[batch_id] = {"status": "in_progress", "requests": request["requests"]}
+        self.reply(self.batch(batch_id))
+
+    def do_GET(self):
+        parts = self.path.split("/")
+        batch_id = parts[4]
+        if self.path.endswith("/results"):
+            self.reply("\n".join(json.dumps(line) for line in self.results(batch_id)))
+        else:
+            response = self.batch(batch_id)
+            self.batches[batch_id]["status"] = "ended"
+            self.reply(response)
+
+    def results(self, batch_id):
+        for request in self.batches[batch_id]["requests"]:
+            content = request["params"]["messages"][0]["content"]
+            if isinstance(content, list):
+                content = "".join(block["text"] for block in content)
+            prompt = content
+            if "FAIL" in prompt:
+                result = {"type": "errored", "error": {"type": "invalid_request_error"}}
+            else:
+                text = json.dumps({"length": len(prompt)})
+                result = {
+                    "type": "succeeded",
+                    "message": {
+                        "id": "msg",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": "test",
+                        "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn",
+                        "usage": {"input_tokens": 1, "output_tokens": 1},
+                    },
+                }
+            yield {"custom_id": request["custom_id"], "result": result}
+
+
+@pytest.fixture
+def anthropic_stand_in():
+    yield from serve(StandInAnthropic)
+
+
+class TestAnthropicBatch:
+    """Test Message Batches mode against a local stand-in server."""
+
+    def make_ai(self, base_url):
+        return AILANG(
+            provider="anthropic", api_key="test", base_url=base_url, batch_poll_interval=0
+        )
+
+    def test_ask_batch(self, anthropic_stand_in):
+        ai = self.make_ai(anthropic_stand_in)
+        progress = []
+        results = ai.ask_batch(
+            ["short", "FAIL"],
+            returns={"length": int_()},
+            progress=lambda done, total: progress.append((done, total)),
+        )
+        assert results[0].ok
+        assert isinstance(results[0].result.length, int)
+        assert "errored" in str(results[1].error)
+        assert progress == [(1, 2), (2, 2)]
+
+    def test_chain_batch(self, anthropic_stand_in):
+        ai = self.make_ai(anthropic_stand_in)
+        results = ai.chain_batch(
+            "analyze {text}",
+            "summarize {input}",
+            rows=[{"text": "first"}, {"text": "FAIL"}],
+            returns={"length": int_()},
+        )
+        assert results[0].ok
+        assert results[0].result.length > 0
+        assert not results[1].ok
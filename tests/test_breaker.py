@@ -0,0 +1,172 @@
+"""
+AILANG Tests - Circuit breaker tests.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ailang.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitPolicy,
+    get_circuit_breaker,
+)
+from ailang.core import AILANG
+from ailang.deadline import DeadlineExceededError, deadline
+from ailang.retry import RetryPolicy
+from tests.fakes import FakeProvider
+
+
+def server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://test")
+    response = httpx.Response(500, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def flaky(name: str, policy: CircuitPolicy, error: Exception | None = None) -> FakeProvider:
+    """Provider that fails with ``error`` (a server error by default) until it is cleared."""
+    return FakeProvider(
+        f"{name}: ok",
+        name=name,
+        error=error or server_error(),
+        image=b"\x89PNG",
+        retry=RetryPolicy(max_retries=0),
+        circuit_breaker=policy,
+    )
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_on_failure_rate(self):
+        breaker = CircuitBreaker(CircuitPolicy(failure_rate=0.5, min_calls=4, window=4))
+        for failed in (True, False, True):
+            assert breaker.allow()
+            breaker.record(failed)
+        assert breaker.state == CLOSED
+        breaker.record(True)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_half_open_probe_closes(self):
+        breaker = CircuitBreaker(CircuitPolicy(min_calls=1, open_for=0.0, probes=1))
+        breaker.record(True)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        assert not breaker.allow()
+        breaker.record(False)
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(CircuitPolicy(min_calls=1, open_for=0.0))
+        breaker.record(True)
+        assert breaker.allow()
+        breaker.record(True)
+        assert breaker.state == OPEN
+
+    def test_released_probe_frees_slot(self):
+        breaker = CircuitBreaker(CircuitPolicy(min_calls=1, open_for=0.0))
+        breaker.record(True)
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+    def test_failure_classification(self):
+        policy = CircuitPolicy()
+        assert policy.is_failure(server_error())
+        assert policy.is_failure(httpx.ConnectError("refused"))
+        assert not policy.is_failure(ValueError("bad request"))
+        assert policy.is_failure(httpx.ReadTimeout("slow"))
+        assert policy.is_failure(asyncio.TimeoutError())
+        assert not policy.is_failure(DeadlineExceededError("caller gave up"))
+
+    def test_shared_per_endpoint(self):
+        policy = CircuitPolicy()
+        first = get_circuit_breaker("shared-test", "http://a", policy)
+        assert get_circuit_breaker("shared-test", "http://a", policy) is first
+        assert get_circuit_breaker("shared-test", "http://b", policy) is not first
+
+
+class TestProviderBreaker:
+    """Test the breaker around provider calls."""
+
+    async def test_fails_fast_when_open(self):
+        provider = flaky("fail-fast", CircuitPolicy(min_calls=2, open_for=60))
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await provider.complete("hi")
+        with pytest.raises(CircuitOpenError):
+            await provider.complete("hi")
+        with pytest.raises(CircuitOpenError):
+            await provider.complete_with_image("hi")
+        assert provider.calls == 2
+
+    async def test_client_errors_keep_circuit_closed(self):
+        provider = flaky("client-error", CircuitPolicy(min_calls=2), ValueError("bad"))
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await provider.complete("hi")
+        assert provider.circuit_breaker.state == CLOSED
+
+    async def test_falls_back_while_open(self):
+        backup = flaky("backup", CircuitPolicy())
+        backup.error = None
+        provider = flaky("primary", CircuitPolicy(min_calls=1, fallback=backup))
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.complete("hi")
+
+        result = await provider.complete("hi")
+        assert result == "backup: ok"
+        assert result.provider == "backup"
+        assert await provider.complete_with_image("hi") == b"\x89PNG"
+
+    async def test_probe_recovers(self):
+        provider = flaky("recovers", CircuitPolicy(min_calls=1, open_for=0.05))
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.complete("hi")
+        with pytest.raises(CircuitOpenError):
+            await provider.complete("hi")
+
+        await asyncio.sleep(0.05)
+        provider.error = None
+        assert await provider.complete("hi") == "recovers: ok"
+        assert provider.circuit_breaker.state == CLOSED
+
+    async def test_client_error_probe_keeps_circuit_half_open(self):
+        provider = flaky("bad-probe", CircuitPolicy(min_calls=1, open_for=0.05))
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.complete("hi")
+
+        await asyncio.sleep(0.05)
+        provider.error = ValueError("bad request")
+        with pytest.raises(ValueError):
+            await provider.complete("hi")
+        assert provider.circuit_breaker.state == HALF_OPEN
+        provider.error = None
+        assert await provider.complete("hi") == "bad-probe: ok"
+        assert provider.circuit_breaker.state == CLOSED
+
+    async def test_deadline_is_not_a_success(self):
+        provider = flaky("deadline", CircuitPolicy(min_calls=1, open_for=0.05))
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.complete("hi")
+
+        await asyncio.sleep(0.05)
+        provider.error = None
+        provider.delay = 1.0
+        with pytest.raises(DeadlineExceededError):
+            with deadline(0.01):
+                await provider.complete("hi")
+        assert provider.circuit_breaker.state == HALF_OPEN
+
+    def test_policy_from_config_dict(self, tmp_path):
+        config = tmp_path / "ailang.yaml"
+        config.write_text("defaults:\n  circuit_breaker:\n    min_calls: 3\n    open_for: 5\n")
+        ai = AILANG(provider="ollama", config_path=str(config))
+        assert ai.provider_config.circuit_breaker == CircuitPolicy(min_calls=3, open_for=5)
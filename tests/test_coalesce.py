@@ -0,0 +1,133 @@
+"""
+AILANG Tests - In-flight request coalescing tests.
+"""
+
+import asyncio
+
+import pytest
+
+from ailang.coalesce import Coalescer
+from ailang.core import AILANG
+from ailang.deadline import DeadlineExceededError, deadline
+from ailang.usage import Usage
+from tests.fakes import FakeProvider
+
+
+def counting(delay: float = 0.05, coalesce: bool = True) -> FakeProvider:
+    """Echoing provider whose calls each take ``delay`` seconds."""
+    return FakeProvider(
+        delay=delay, usage=Usage(prompt_tokens=10, completion_tokens=5), coalesce=coalesce
+    )
+
+
+class TestCoalescer:
+    """Test the singleflight primitive."""
+
+    async def test_shares_one_call(self):
+        coalescer = Coalescer()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(coalescer.run("key", fetch) for _ in range(5)))
+        assert calls == 1
+        assert [result for result, _ in results] == ["result"] * 5
+        assert [shared for _, shared in results].count(False) == 1
+        assert coalescer.in_flight == 0
+
+    async def test_error_reaches_every_waiter(self):
+        coalescer = Coalescer()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(coalescer.run("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_cancelled_waiter_leaves_call_running(self):
+        coalescer = Coalescer()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.ensure_future(coalescer.run("key", fetch))
+        second = asyncio.ensure_future(coalescer.run("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == ("result", True)
+
+    async def test_last_waiter_cancels_call(self):
+        coalescer = Coalescer()
+        started = asyncio.Event()
+        cancelled = False
+
+        async def fetch():
+            nonlocal cancelled
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        waiter = asyncio.ensure_future(coalescer.run("key", fetch))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert cancelled
+        assert coalescer.in_flight == 0
+
+
+class TestProviderCoalescing:
+    """Test coalescing around provider completions."""
+
+    async def test_identical_prompts_share_call(self):
+        provider = counting()
+        results = await asyncio.gather(*(provider.complete("hi") for _ in range(4)))
+        assert provider.calls == 1
+        assert results == ["hi"] * 4
+        # Usage is reported once
+        assert sum(result.usage.total_tokens for result in results) == 15
+        assert all(result.model == "test-model" for result in results)
+
+    async def test_different_prompts_not_shared(self):
+        provider = counting()
+        await asyncio.gather(provider.complete("a"), provider.complete("b"))
+        assert provider.calls == 2
+
+    async def test_disabled_by_default(self):
+        provider = counting(coalesce=False)
+        await asyncio.gather(provider.complete("hi"), provider.complete("hi"))
+        assert provider.calls == 2
+
+    async def test_waiter_deadline_is_its_own(self):
+        provider = counting(delay=0.1)
+
+        async def impatient():
+            with deadline(0.02):
+                return await provider.complete("hi")
+
+        results = await asyncio.gather(impatient(), provider.complete("hi"), return_exceptions=True)
+        assert isinstance(results[0], DeadlineExceededError)
+        assert results[1] == "hi"
+        assert provider.calls == 1
+        assert provider.cancelled == 0
+
+    async def test_run_async(self):
+        provider = counting()
+        ai = AILANG(provider=provider)
+        results = await asyncio.gather(*(ai.run_async('write "haiku"') for _ in range(3)))
+        assert len(set(results)) == 1
+        assert provider.calls == 1
+        assert ai.ledger.total.calls == 3
+        assert ai.ledger.total.usage.total_tokens == 15
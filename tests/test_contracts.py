@@ -231,6 +231,39 @@ class TestOutputContract:
         assert "100" in prompt
 
 
+class TestJSONSchema:
+    """Test compiling contracts to JSON Schema."""
+
+    def test_types(self):
+        assert int_(min=1, max=5).to_json_schema() == {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 5,
+        }
+        assert float_().to_json_schema() == {"type": "number"}
+        assert bool_().to_json_schema() == {"type": "boolean"}
+        assert enum("a", "b").to_json_schema() == {"type": "string", "enum": ["a", "b"]}
+        assert code("rust").to_json_schema()["type"] == "string"
+        assert list_(str_(), exactly=3).to_json_schema()["minItems"] == 3
+
+    def test_optional_fields(self):
+        contract = OutputContract({"name": str_(), "age": optional(int_())})
+        assert contract.to_json_schema()["required"] == ["name"]
+
+        strict = contract.to_json_schema(strict=True)
+        assert strict["required"] == ["name", "age"]
+        assert strict["additionalProperties"] is False
+        assert strict["properties"]["age"]["anyOf"][1] == {"type": "null"}
+
+    def test_strict_leaves_string_limits_to_local_validation(self):
+        field = str_(max=10, pattern="^a")
+        assert field.to_json_schema()["maxLength"] == 10
+        strict = field.to_json_schema(strict=True)
+        assert "maxLength" not in strict and "pattern" not in strict
+        assert "10" in strict["description"]
+        assert list_().to_json_schema(strict=True)["items"] == {"type": "string"}
+
+
 class TestContractResult:
     """Test ContractResult access patterns."""
 
@@ -256,3 +289,25 @@ class TestContractResult:
 
         with pytest.raises(AttributeError):
             _ = result.missing
+
+
+class TestVote:
+    """Test majority voting across candidates."""
+
+    def test_majority_per_field(self):
+        contract = OutputContract(
+            {"label": enum("yes", "no"), "count": int_(), "ok": bool_(), "why": str_()}
+        )
+        index, data = contract.vote(
+            [
+                {"label": "yes", "count": 1, "ok": True, "why": "a"},
+                {"label": "no", "count": 2, "ok": True, "why": "b"},
+                {"label": "no", "count": 2, "ok": False, "why": "c"},
+            ]
+        )
+        assert data == {"label": "no", "count": 2, "ok": True, "why": "b"}
+        assert index == 1
+
+    def test_tie_goes_to_earliest(self):
+        contract = OutputContract({"label": enum("yes", "no")})
+        assert contract.vote([{"label": "no"}, {"label": "yes"}]) == (0, {"label": "no"})
@@ -0,0 +1,93 @@
+"""
+AILANG Tests - Deadline propagation tests.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ailang.contracts import str_
+from ailang.core import AILANG
+from ailang.deadline import (
+    DeadlineExceededError,
+    deadline,
+    no_deadline,
+    remaining,
+    within_deadline,
+)
+from ailang.retry import RetryPolicy
+from tests.fakes import FakeProvider
+
+
+class TestDeadline:
+    """Test deadline scopes."""
+
+    def test_no_deadline(self):
+        assert remaining() is None
+
+    def test_nested_budget_never_extends(self):
+        with deadline(1.0):
+            with deadline(10.0):
+                assert remaining() <= 1.0
+            with deadline(0.1):
+                assert remaining() <= 0.1
+        assert remaining() is None
+
+    def test_no_deadline_lifts_enclosing_budget(self):
+        with deadline(1.0):
+            with no_deadline():
+                assert remaining() is None
+            assert remaining() <= 1.0
+
+    async def test_within_deadline_cancels(self):
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceededError):
+                await within_deadline(asyncio.sleep(1))
+
+    async def test_exhausted_budget_fails_fast(self):
+        with deadline(-1):
+            with pytest.raises(DeadlineExceededError):
+                await within_deadline(asyncio.sleep(1))
+
+
+class TestPropagation:
+    """Test timeouts on run, ask and chain."""
+
+    async def test_run_times_out_and_cancels_call(self):
+        provider = FakeProvider(delay=1.0)
+        ai = AILANG(provider=provider)
+        with pytest.raises(DeadlineExceededError):
+            await ai.run_async('write "haiku"', timeout=0.05)
+        assert provider.cancelled == 1
+
+    async def test_run_within_budget(self):
+        ai = AILANG(provider=FakeProvider("done"))
+        assert await ai.run_async('write "haiku"', timeout=1.0) == "done"
+
+    async def test_contract_retry_shares_budget(self):
+        provider = FakeProvider(["not json", '{"a": "b"}'], delay=0.06)
+        ai = AILANG(provider=provider)
+        with pytest.raises(DeadlineExceededError):
+            await ai.ask_async("q", returns={"a": str_()}, timeout=0.1)
+        assert provider.calls == 2
+
+    async def test_chain_has_one_budget(self):
+        provider = FakeProvider(delay=0.06)
+        ai = AILANG(provider=provider)
+        with pytest.raises(DeadlineExceededError):
+            await ai.chain_async('write "a"', "fix !all", "test [pytest]", timeout=0.1)
+        assert provider.calls == 2
+
+    async def test_retry_stops_before_deadline(self):
+        attempts = []
+
+        async def fail():
+            attempts.append(1)
+            raise httpx.ConnectError("refused")
+
+        policy = RetryPolicy(max_retries=5, base_delay=1.0, jitter=False)
+        with deadline(0.5):
+            with pytest.raises(httpx.ConnectError):
+                await policy.call(fail)
+        assert len(attempts) == 1
@@ -0,0 +1,67 @@
+"""
+AILANG Tests - Image generation and storage tests.
+"""
+
+import base64
+import hashlib
+import itertools
+from types import SimpleNamespace
+
+from ailang.core import AILANG
+from ailang.images import image_extension, store_image
+from ailang.providers import OpenAIProvider, ProviderConfig
+from tests.fakes import FakeProvider
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def numbered_images() -> FakeProvider:
+    """Provider that returns a distinct small PNG per call."""
+    numbers = itertools.count(1)
+    return FakeProvider(image=lambda: PNG + str(next(numbers)).encode())
+
+
+class TestStorage:
+    """Test content-addressed image storage."""
+
+    def test_extension(self):
+        assert image_extension(PNG) == "png"
+        assert image_extension(b"\xff\xd8\xff") == "jpg"
+        assert image_extension(b"RIFF\x00\x00\x00\x00WEBP") == "webp"
+
+    async def test_named_by_content(self, tmp_path):
+        path = await store_image(PNG + b"a", tmp_path / "images")
+        assert path.name == hashlib.sha256(PNG + b"a").hexdigest() + ".png"
+        assert path.read_bytes() == PNG + b"a"
+        assert await store_image(PNG + b"a", tmp_path / "images") == path
+        assert [p.name for p in (tmp_path / "images").iterdir()] == [path.name]
+
+
+class TestImageActions:
+    """Test image actions through AILANG."""
+
+    async def test_run_returns_path(self, tmp_path):
+        ai = AILANG(provider=numbered_images(), image_dir=tmp_path)
+        path = await ai.run_async('img "sunset" !photo')
+        assert path.startswith(str(tmp_path))
+        assert path.endswith(".png")
+
+    async def test_variants(self, tmp_path):
+        provider = numbered_images()
+        ai = AILANG(provider=provider, image_dir=tmp_path)
+        paths = await ai.image_async('logo "coffee shop"', n=3)
+        assert provider.calls == 3
+        assert len(set(paths)) == 3
+        assert all(path.exists() for path in paths)
+
+    async def test_openai_decodes_base64(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test"))
+        requests = []
+
+        async def generate(**kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(data=[SimpleNamespace(b64_json=base64.b64encode(PNG).decode())])
+
+        provider.client.images.generate = generate
+        assert await provider.complete_with_image("sunset") == PNG
+        assert requests[0]["response_format"] == "b64_json"
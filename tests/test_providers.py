@@ -0,0 +1,483 @@
+"""
+AILANG Tests - Provider tests.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+from ailang.contracts import OutputContract, enum, int_, list_, optional, str_
+from ailang.core import AILANG
+from ailang.providers import (
+    AnthropicProvider,
+    GoogleProvider,
+    OllamaProvider,
+    OpenAIProvider,
+    Prompt,
+    PromptSegment,
+    ProviderConfig,
+    evict_provider,
+    get_shared_provider,
+    provider_key,
+    shutdown_providers,
+)
+from tests.fakes import FakeProvider
+
+
+def mock_http(handler):
+    """Build a client factory that routes requests through a mock transport."""
+
+    def build():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    return build
+
+
+class TestPooledClients:
+    """Test that HTTP providers reuse one pooled client."""
+
+    async def test_ollama_reuses_client(self):
+        provider = OllamaProvider(ProviderConfig(api_key=""))
+        built = []
+
+        def handler(request):
+            return httpx.Response(200, json={"response": "hi"})
+
+        def build():
+            client = mock_http(handler)()
+            built.append(client)
+            return client
+
+        provider._build_http_client = build
+        assert await provider.complete("a") == "hi"
+        assert await provider.complete("b") == "hi"
+        assert len(built) == 1
+
+        await provider.aclose()
+        assert built[0].is_closed
+
+    async def test_google_reuses_client(self):
+        provider = GoogleProvider(ProviderConfig(api_key="key"))
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.params["key"])
+            return httpx.Response(
+                200, json={"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+            )
+
+        provider._build_http_client = mock_http(handler)
+        assert await provider.complete("a") == "ok"
+        client = provider._http_client()
+        assert await provider.complete("b") == "ok"
+        assert provider._http_client() is client
+        assert seen == ["key", "key"]
+        await provider.aclose()
+
+    def test_sdk_client_follows_event_loop(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test"))
+
+        async def clients():
+            return provider.client, provider.client
+
+        first, again = asyncio.run(clients())
+        assert again is first
+
+        async def use_and_close():
+            client = provider.client
+            await provider.aclose()
+            return client
+
+        second = asyncio.run(use_and_close())
+        assert second is not first
+        assert second.is_closed()
+
+    def test_pool_limits_from_config(self):
+        config = ProviderConfig(api_key="", max_connections=7, max_keepalive_connections=3)
+        client = OllamaProvider(config)._build_http_client()
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+
+
+class TestStreaming:
+    """Test token streaming."""
+
+    async def test_ollama_ndjson(self):
+        provider = OllamaProvider(ProviderConfig(api_key=""))
+        lines = [
+            {"response": "Hel", "done": False},
+            {"response": "lo", "done": False},
+            {"response": "", "done": True, "prompt_eval_count": 7, "eval_count": 2},
+        ]
+
+        def handler(request):
+            assert json.loads(request.content)["stream"] is True
+            body = "\n".join(json.dumps(line) for line in lines) + "\n"
+            return httpx.Response(200, text=body)
+
+        provider._build_http_client = mock_http(handler)
+        finished = []
+        chunks = [chunk async for chunk in provider.stream("hi", on_complete=finished.append)]
+        assert chunks == ["Hel", "lo"]
+        assert finished == ["Hello"]
+        assert finished[0].usage.total_tokens == 9
+        assert finished[0].provider == "ollama"
+
+    async def test_openai_requests_usage(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test", model="gpt-5.2"))
+        sent = []
+
+        def chunk(text=None, usage=None):
+            choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text else []
+            dump = SimpleNamespace(model_dump=lambda: usage) if usage else None
+            return SimpleNamespace(choices=choices, usage=dump)
+
+        async def create(**params):
+            sent.append(params)
+
+            async def chunks():
+                yield chunk("Hel")
+                yield chunk("lo")
+                yield chunk(usage={"prompt_tokens": 5, "completion_tokens": 2})
+
+            return chunks()
+
+        provider.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        finished = []
+        chunks = [chunk async for chunk in provider.stream("hi", on_complete=finished.append)]
+        assert chunks == ["Hel", "lo"]
+        assert sent[0]["stream_options"] == {"include_usage": True}
+        assert finished[0].usage.total_tokens == 7
+        assert provider.usage.total_tokens == 7
+
+    async def test_google_sse(self):
+        provider = GoogleProvider(ProviderConfig(api_key="key"))
+
+        def event(text):
+            return "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+        def handler(request):
+            assert request.url.path.endswith(":streamGenerateContent")
+            assert request.url.params["alt"] == "sse"
+            return httpx.Response(200, text=f"{event('Hel')}\n\n{event('lo')}\n\n")
+
+        provider._build_http_client = mock_http(handler)
+        chunks = [chunk async for chunk in provider.stream("hi")]
+        assert chunks == ["Hel", "lo"]
+
+    async def test_default_stream_yields_completion(self):
+        provider = FakeProvider()
+        chunks = [chunk async for chunk in provider.stream("hello")]
+        assert chunks == ["hello"]
+
+    async def test_run_stream(self):
+        ai = AILANG(provider="ollama")
+        ai._provider = FakeProvider(config=ai.provider_config)
+        chunks = [chunk async for chunk in ai.run_stream('write "hello"')]
+        assert "".join(chunks) == ai.transpile_only('write "hello"')
+        assert ai.ledger.by_action["write"].calls == 1
+
+
+class TestSharedProviders:
+    """Test the process-wide provider registry."""
+
+    def test_same_settings_share_instance(self):
+        first = AILANG(provider="ollama", model="registry-test")
+        second = AILANG(provider="ollama", model="registry-test")
+        assert first.provider is second.provider
+
+    def test_different_settings_do_not_share(self):
+        base = get_shared_provider("ollama", ProviderConfig(api_key="", model="registry-test"))
+        assert base is not get_shared_provider(
+            "ollama", ProviderConfig(api_key="", model="registry-other")
+        )
+        assert base is not get_shared_provider(
+            "ollama", ProviderConfig(api_key="other-key", model="registry-test")
+        )
+        assert base is not get_shared_provider(
+            "ollama", ProviderConfig(api_key="", model="registry-test", temperature=0.1)
+        )
+
+    def test_aliases_share_instance(self):
+        config = ProviderConfig(api_key="", model="registry-alias")
+        assert get_shared_provider("ollama", config) is get_shared_provider("local", config)
+
+    def test_unshared_instance(self):
+        ai = AILANG(provider="ollama", model="registry-test", shared=False)
+        assert ai.provider is not AILANG(provider="ollama", model="registry-test").provider
+
+    def test_key_does_not_contain_api_key(self):
+        key = provider_key("openai", ProviderConfig(api_key="sk-secret"))
+        assert "sk-secret" not in repr(key)
+
+    async def test_evict_and_shutdown(self):
+        config = ProviderConfig(api_key="", model="registry-evict")
+        provider = get_shared_provider("ollama", config)
+        assert evict_provider("ollama", config) is provider
+        assert get_shared_provider("ollama", config) is not provider
+
+        await shutdown_providers()
+        assert get_shared_provider("ollama", config) is not provider
+
+
+class TestPromptCaching:
+    """Test prompt segmentation and Anthropic cache breakpoints."""
+
+    def make_prompt(self, context_value):
+        ai = AILANG(provider="ollama")
+        contract = OutputContract({"answer": str_()})
+        return ai._build_ask_prompt("what?", contract, "formal", {"doc": context_value})
+
+    def test_prompt_is_flat_text(self):
+        prompt = self.make_prompt("short")
+        assert prompt.startswith("Use a formal, professional tone.\n\ndoc: short\n\nwhat?")
+        assert prompt.extend(PromptSegment("more")).endswith("\n\nmore")
+
+    def test_system_segments_are_cached(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test"))
+        params = provider._message_params(self.make_prompt("short"))
+        assert params["system"][0]["text"] == "Use a formal, professional tone."
+        assert params["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        content = params["messages"][0]["content"]
+        assert [block["text"] for block in content] == ["doc: short", "what?"]
+        assert not any("cache_control" in block for block in content)
+
+    def test_large_context_gets_breakpoint(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test", cache_min_chars=100))
+        params = provider._message_params(self.make_prompt("x" * 200))
+        content = params["messages"][0]["content"]
+        assert content[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in content[1]
+
+    def test_plain_prompts_and_opt_out(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test"))
+        assert provider._message_params("hi")["messages"][0]["content"] == "hi"
+        provider = AnthropicProvider(ProviderConfig(api_key="test", prompt_caching=False))
+        params = provider._message_params(Prompt([PromptSegment("a", role="system")]))
+        assert "system" not in params
+
+    def test_records_cache_usage(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test"))
+        usage = SimpleNamespace(
+            input_tokens=10,
+            output_tokens=5,
+            cache_read_input_tokens=90,
+            cache_creation_input_tokens=0,
+        )
+        provider._record_usage(SimpleNamespace(usage=usage))
+        provider._record_usage(SimpleNamespace(usage=usage))
+        assert provider.usage.prompt_tokens == 200
+        assert provider.usage.cached_tokens == 180
+        assert provider.usage.cache_hit_rate == 0.9
+
+
+class TestStructuredOutput:
+    """Test native structured output requests."""
+
+    def test_openai_sends_strict_schema(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test", model="gpt-5.2"))
+        contract = OutputContract({"answer": str_()})
+        params = provider._chat_params("hi", contract)
+        assert params["response_format"]["json_schema"]["strict"] is True
+        assert params["response_format"]["json_schema"]["schema"]["required"] == ["answer"]
+        assert "response_format" not in provider._chat_params("hi")
+
+    def test_openai_model_detection_and_override(self):
+        contract = OutputContract({"answer": str_()})
+        legacy = OpenAIProvider(ProviderConfig(api_key="test", model="gpt-3.5-turbo"))
+        assert "response_format" not in legacy._chat_params("hi", contract)
+        forced = OpenAIProvider(
+            ProviderConfig(api_key="test", model="local-model", structured_output=True)
+        )
+        assert "response_format" in forced._chat_params("hi", contract)
+
+    def test_anthropic_forces_contract_tool(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test"))
+        contract = OutputContract({"answer": str_()})
+        params = provider._message_params("hi", contract)
+        assert params["tool_choice"] == {"type": "tool", "name": "output"}
+        assert params["tools"][0]["input_schema"]["required"] == ["answer"]
+        assert "tools" not in provider._message_params("hi")
+
+        off = AnthropicProvider(ProviderConfig(api_key="test", structured_output=False))
+        assert "tools" not in off._message_params("hi", contract)
+
+    def test_anthropic_reads_tool_input(self):
+        message = SimpleNamespace(
+            content=[SimpleNamespace(type="tool_use", input={"answer": "42"})]
+        )
+        text = AnthropicProvider._message_text(message)
+        assert OutputContract({"answer": str_()}).parse_response(text) == {"answer": "42"}
+
+    async def test_google_response_schema_and_usage(self):
+        provider = GoogleProvider(ProviderConfig(api_key="key"))
+        contract = OutputContract({"answer": str_(max=5), "note": optional(str_())})
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                json={
+                    "candidates": [{"content": {"parts": [{"text": '{"answer": "ok"}'}]}}],
+                    "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 4},
+                },
+            )
+
+        provider._build_http_client = mock_http(handler)
+        assert await provider.complete("hi", contract) == '{"answer": "ok"}'
+        config = sent[0]["generationConfig"]
+        assert config["responseMimeType"] == "application/json"
+        schema = config["responseSchema"]
+        assert schema["required"] == ["answer"]
+        assert schema["propertyOrdering"] == ["answer", "note"]
+        assert schema["properties"]["note"] == {
+            "type": "string",
+            "description": "text",
+            "nullable": True,
+        }
+        assert "maxLength" not in schema["properties"]["answer"]
+        assert "additionalProperties" not in schema
+        assert provider.usage.prompt_tokens == 12
+        assert provider.usage.completion_tokens == 4
+
+        await provider.complete("hi")
+        assert "responseSchema" not in sent[1]["generationConfig"]
+
+    def test_google_untyped_list_gets_items(self):
+        provider = GoogleProvider(ProviderConfig(api_key="key"))
+        contract = OutputContract({"tags": list_(), "sizes": list_(int_())})
+        schema = provider._request_body("hi", contract)["generationConfig"]["responseSchema"]
+        assert schema["properties"]["tags"]["items"] == {"type": "string"}
+        assert schema["properties"]["sizes"]["items"]["type"] == "integer"
+
+
+class TestOllamaOptions:
+    """Test Ollama request options and warm-up."""
+
+    async def test_format_keep_alive_and_options(self):
+        provider = OllamaProvider(ProviderConfig(api_key="", num_ctx=8192, num_predict=256))
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content))
+            return httpx.Response(200, json={"response": '{"answer": "ok"}'})
+
+        provider._build_http_client = mock_http(handler)
+        await provider.complete("hi", OutputContract({"answer": str_()}))
+        assert sent[0]["format"]["required"] == ["answer"]
+        assert sent[0]["keep_alive"] == "30m"
+        assert sent[0]["options"] == {"num_ctx": 8192, "num_predict": 256}
+
+        await provider.complete("hi")
+        assert "format" not in sent[1]
+
+    async def test_warm_up_loads_model(self):
+        provider = OllamaProvider(ProviderConfig(api_key="", model="llama3", keep_alive=-1))
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content))
+            return httpx.Response(200, json={"response": "", "done": True})
+
+        provider._build_http_client = mock_http(handler)
+        await provider.warm_up()
+        assert sent == [{"model": "llama3", "stream": False, "keep_alive": -1}]
+
+
+class TestSamples:
+    """Test multi-sample contract calls."""
+
+    async def test_openai_samples_in_one_request(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test", model="gpt-5.2"))
+        sent = []
+
+        def choice(text: str) -> SimpleNamespace:
+            return SimpleNamespace(message=SimpleNamespace(content=text, refusal=None))
+
+        async def create(**params):
+            sent.append(params)
+            usage = {"prompt_tokens": 10, "completion_tokens": 9}
+            return SimpleNamespace(
+                choices=[choice("a"), choice("b"), choice("c")],
+                usage=SimpleNamespace(model_dump=lambda: usage),
+                model="gpt-5.2",
+            )
+
+        provider.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        samples = await provider.complete_samples("hi", n=3)
+        assert len(sent) == 1 and sent[0]["n"] == 3
+        assert samples == ["a", "b", "c"]
+        assert [sample.usage.total_tokens for sample in samples] == [19, 0, 0]
+
+    async def test_other_providers_sample_concurrently(self):
+        provider = FakeProvider(["a", "b"])
+        assert await provider.complete_samples("hi", n=2) == ["a", "b"]
+        assert provider.calls == 2
+
+    async def test_ask_returns_first_valid(self):
+        provider = FakeProvider(["oops", '{"answer": "one"}', '{"answer": "two"}'])
+        ai = AILANG(provider=provider)
+        result = await ai.ask_async("q", returns={"answer": str_()}, samples=3)
+        assert result.answer == "one"
+        assert provider.calls == 3
+
+    async def test_ask_votes(self):
+        provider = FakeProvider(['{"label": "yes"}', '{"label": "no"}', '{"label": "no"}'])
+        ai = AILANG(provider=provider)
+        result = await ai.ask_async("q", returns={"label": enum("yes", "no")}, samples=3, vote=True)
+        assert result.label == "no"
+
+    async def test_ask_retries_when_no_sample_is_valid(self):
+        provider = FakeProvider(["bad", "worse", '{"answer": "ok"}'])
+        ai = AILANG(provider=provider)
+        result = await ai.ask_async("q", returns={"answer": str_()}, samples=2)
+        assert result.answer == "ok"
+        assert provider.calls == 3
+
+
+class TestWarmUp:
+    """Test connection pre-warming."""
+
+    async def test_openai_lists_models(self):
+        provider = OpenAIProvider(ProviderConfig(api_key="test"))
+        listed = []
+
+        async def list_models():
+            listed.append(True)
+
+        provider.client = SimpleNamespace(models=SimpleNamespace(list=list_models))
+        await provider.warm_up()
+        assert listed == [True]
+
+    async def test_probe_sends_completion(self):
+        provider = FakeProvider(["OK"])
+        await provider.warm_up(probe=True)
+        assert provider.calls == 1
+
+    async def test_google_fetches_model(self):
+        provider = GoogleProvider(ProviderConfig(api_key="key", model="gemini-test"))
+        urls = []
+
+        def handler(request):
+            urls.append(str(request.url))
+            return httpx.Response(200, json={"name": "models/gemini-test"})
+
+        provider._build_http_client = mock_http(handler)
+        await provider.warm_up()
+        assert urls == [
+            "https://generativelanguage.googleapis.com/v1beta/models/gemini-test?key=key"
+        ]
+        assert provider._http is not None
+
+    async def test_ailang_warm_up(self):
+        provider = FakeProvider(["OK"])
+        await AILANG(provider=provider).warm_up(probe=True)
+        assert provider.calls == 1
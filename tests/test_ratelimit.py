@@ -0,0 +1,61 @@
+"""
+AILANG Tests - Rate limiter tests.
+"""
+
+from ailang.providers import OllamaProvider, ProviderConfig
+from ailang.ratelimit import RateLimiter, TokenBucket, get_rate_limiter
+
+
+class TestTokenBucket:
+    """Test token bucket accounting."""
+
+    def test_starts_full(self):
+        bucket = TokenBucket(rate_per_minute=60)
+        assert all(bucket.reserve() == 0 for _ in range(60))
+
+    def test_waits_when_empty(self):
+        bucket = TokenBucket(rate_per_minute=60)
+        bucket.reserve(60)
+        # One token refills every second
+        assert 0.9 < bucket.reserve() <= 1.0
+        assert 1.9 < bucket.reserve() <= 2.0
+
+    def test_oversized_request_is_capped(self):
+        bucket = TokenBucket(rate_per_minute=100)
+        assert bucket.reserve(1000) == 0
+
+
+class TestRateLimiter:
+    """Test combined request and token limits."""
+
+    def test_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=2)
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert limiter.reserve() > 29
+
+    def test_tokens_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6000)
+        assert limiter.reserve(tokens=6000) == 0
+        assert 9 < limiter.reserve(tokens=1000) <= 10
+
+    def test_headroom(self):
+        limiter = RateLimiter(requests_per_minute=10)
+        assert limiter.headroom() == 1.0
+        limiter.reserve()
+        assert 0.89 < limiter.headroom() < 0.91
+        assert RateLimiter().headroom() == 1.0
+
+    def test_shared_by_provider_and_model(self):
+        a = get_rate_limiter("test", "shared-model", requests_per_minute=10)
+        b = get_rate_limiter("test", "shared-model", requests_per_minute=10)
+        c = get_rate_limiter("test", "other-model", requests_per_minute=10)
+        assert a is b
+        assert a is not c
+
+    def test_providers_share_limiter(self):
+        config = ProviderConfig(api_key="", model="limited", requests_per_minute=30)
+        first = OllamaProvider(config)
+        second = OllamaProvider(config)
+        assert first.rate_limiter is second.rate_limiter
+        assert OllamaProvider(ProviderConfig(api_key="")).rate_limiter is None
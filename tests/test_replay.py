@@ -0,0 +1,150 @@
+"""
+AILANG Tests - Record/replay provider tests.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+
+import httpx
+import pytest
+
+from ailang.contracts import enum
+from ailang.core import AILANG
+from ailang.providers import PROVIDERS, ProviderConfig, ReplayProvider
+from ailang.replay import Cassette, CassetteMissError, ReplayPolicy
+from ailang.retry import RetryPolicy
+from ailang.usage import Completion, Usage
+from tests.fakes import FakeProvider
+
+
+def upstream_provider(config: ProviderConfig) -> FakeProvider:
+    """Stand-in for a real provider while recording."""
+    answers = itertools.count(1)
+
+    def respond(prompt: str, contract) -> Completion:
+        if contract is not None:
+            return Completion('{"label": "positive"}', Usage(prompt_tokens=20, completion_tokens=5))
+        return Completion(f"answer {next(answers)}", Usage(prompt_tokens=10, completion_tokens=3))
+
+    provider = FakeProvider(respond, config=config, name="upstream", image=b"\x89PNG image")
+    provider.model = config.model or "upstream-model"
+    return provider
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "upstream", upstream_provider)
+
+
+def replay_ai(path, **policy) -> AILANG:
+    return AILANG(
+        provider="replay",
+        replay=ReplayPolicy(str(path), **policy),
+        retry=RetryPolicy(max_retries=0),
+        shared=False,
+    )
+
+
+class TestRecordReplay:
+    """Test recording exchanges and replaying them."""
+
+    async def test_round_trip(self, tmp_path, upstream):
+        cassette = tmp_path / "golden.jsonl"
+        recorder = replay_ai(cassette, record="upstream")
+        recorded = await recorder.run_async('write "haiku"')
+        result = await recorder.ask_async("review", returns={"label": enum("positive", "negative")})
+        assert result.label == "positive"
+        assert recorder.provider.upstream.calls == 2
+
+        lines = cassette.read_text().splitlines()
+        assert len(lines) == 2
+        assert "haiku" not in lines[0]
+        assert json.loads(lines[0])["usage"] == {"prompt_tokens": 10, "completion_tokens": 3}
+
+        player = replay_ai(cassette, latency="none")
+        replayed = await player.run_async('write "haiku"')
+        assert replayed == recorded
+        assert replayed.model == "upstream-model"
+        assert replayed.usage.total_tokens == 13
+        result = await player.ask_async("review", returns={"label": enum("positive", "negative")})
+        assert result.label == "positive"
+
+    async def test_images(self, tmp_path, upstream):
+        cassette = tmp_path / "images.jsonl"
+        recorder = replay_ai(cassette, record="upstream")
+        assert await recorder.provider.complete_with_image("a cat") == b"\x89PNG image"
+        player = replay_ai(cassette)
+        assert await player.provider.complete_with_image("a cat") == b"\x89PNG image"
+
+    async def test_repeated_recordings_replay_in_turn(self, tmp_path, upstream):
+        cassette = tmp_path / "golden.jsonl"
+        recorder = replay_ai(cassette, record="upstream")
+        await recorder.provider.complete("same")
+        await recorder.provider.complete("same")
+
+        player = replay_ai(cassette, latency="none")
+        answers = [await player.provider.complete("same") for _ in range(3)]
+        assert answers == ["answer 1", "answer 2", "answer 1"]
+
+    async def test_missing_exchange(self, tmp_path):
+        player = replay_ai(tmp_path / "empty.jsonl")
+        with pytest.raises(CassetteMissError):
+            await player.run_async('ask "anything"')
+
+    def test_requires_policy(self):
+        with pytest.raises(ValueError):
+            ReplayProvider(ProviderConfig(api_key=""))
+
+
+class TestSimulation:
+    """Test simulated latency, errors and throughput."""
+
+    async def _cassette(self, tmp_path, latency: float = 0.0):
+        cassette = Cassette(tmp_path / "sim.jsonl")
+        await cassette.add(
+            {"key": Cassette.key("complete", "hi"), "text": "hello", "latency": latency}
+        )
+        return cassette.path
+
+    def test_latency_modes(self):
+        import random
+
+        rng = random.Random(0)
+        assert ReplayPolicy("c", latency_scale=2.0).sample_latency(0.5, rng) == 1.0
+        assert ReplayPolicy("c", latency="none").sample_latency(0.5, rng) == 0.0
+        assert ReplayPolicy("c", latency="fixed", latency_mean=0.3).sample_latency(0, rng) == 0.3
+        uniform = ReplayPolicy("c", latency="uniform", latency_mean=1.0, latency_spread=0.2)
+        assert all(0.8 <= uniform.sample_latency(0, rng) <= 1.2 for _ in range(100))
+        lognormal = ReplayPolicy("c", latency="lognormal", latency_mean=1.0, latency_spread=0.5)
+        samples = [lognormal.sample_latency(0, rng) for _ in range(5000)]
+        assert 0.9 < sum(samples) / len(samples) < 1.1
+        with pytest.raises(ValueError):
+            ReplayPolicy("c", latency="gaussian")
+
+    async def test_recorded_latency(self, tmp_path):
+        player = replay_ai(await self._cassette(tmp_path, latency=0.05))
+        start = time.monotonic()
+        await player.provider.complete("hi")
+        assert time.monotonic() - start >= 0.05
+
+    async def test_error_injection(self, tmp_path):
+        player = replay_ai(await self._cassette(tmp_path), error_rate=1.0, error_status=500)
+        with pytest.raises(httpx.HTTPStatusError) as e:
+            await player.provider.complete("hi")
+        assert e.value.response.status_code == 500
+
+    async def test_throughput_limit(self, tmp_path):
+        player = replay_ai(await self._cassette(tmp_path), requests_per_second=20)
+        # Allow the initial burst, then measure the sustained rate
+        await asyncio.gather(*(player.provider.complete("hi") for _ in range(20)))
+        start = time.monotonic()
+        await asyncio.gather(*(player.provider.complete("hi") for _ in range(4)))
+        assert time.monotonic() - start >= 0.15
+
+    def test_policy_from_config_dict(self, tmp_path):
+        config = tmp_path / "ailang.yaml"
+        config.write_text("defaults:\n  replay:\n    cassette: golden.jsonl\n    latency: none\n")
+        ai = AILANG(provider="replay", config_path=str(config))
+        assert ai.provider_config.replay == ReplayPolicy("golden.jsonl", latency="none")
@@ -0,0 +1,123 @@
+"""
+AILANG Tests - Retry policy tests.
+"""
+
+import httpx
+import pytest
+
+from ailang.providers import OllamaProvider, ProviderConfig
+from ailang.retry import RetryPolicy, retry_after, status_code
+
+
+def status_error(status: int, headers: dict[str, str] | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://test")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestClassification:
+    """Test which errors are retried."""
+
+    def test_status_code(self):
+        assert status_code(status_error(429)) == 429
+        assert status_code(ValueError()) is None
+
+    def test_retryable_statuses(self):
+        policy = RetryPolicy()
+        assert policy.is_retryable(status_error(429))
+        assert policy.is_retryable(status_error(503))
+        assert not policy.is_retryable(status_error(400))
+        assert not policy.is_retryable(status_error(401))
+
+    def test_connection_errors(self):
+        policy = RetryPolicy()
+        assert policy.is_retryable(httpx.ConnectError("refused"))
+        assert policy.is_retryable(httpx.ReadTimeout("slow"))
+        assert not policy.is_retryable(KeyError("response"))
+
+    def test_retry_after(self):
+        assert retry_after(status_error(429, {"retry-after": "3"})) == 3.0
+        assert retry_after(status_error(429, {"retry-after-ms": "250"})) == 0.25
+        assert retry_after(status_error(429)) is None
+
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=False)
+        assert [policy.backoff(i) for i in range(4)] == [1.0, 2.0, 4.0, 5.0]
+        jittered = RetryPolicy(base_delay=1.0, max_delay=5.0)
+        assert all(0 <= jittered.backoff(10) <= 5.0 for _ in range(20))
+
+
+class TestCall:
+    """Test RetryPolicy.call."""
+
+    async def test_retries_until_success(self):
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise status_error(503)
+            return "ok"
+
+        assert await RetryPolicy(base_delay=0).call(flaky) == "ok"
+        assert len(calls) == 3
+
+    async def test_gives_up_after_max_retries(self):
+        calls = []
+
+        async def down():
+            calls.append(1)
+            raise status_error(500)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryPolicy(max_retries=2, base_delay=0).call(down)
+        assert len(calls) == 3
+
+    async def test_does_not_retry_client_errors(self):
+        calls = []
+
+        async def bad():
+            calls.append(1)
+            raise status_error(400)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryPolicy(base_delay=0).call(bad)
+        assert len(calls) == 1
+
+    async def test_budget_exceeded_by_retry_after(self):
+        calls = []
+
+        async def limited():
+            calls.append(1)
+            raise status_error(429, {"retry-after": "120"})
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryPolicy(budget=10.0).call(limited)
+        assert len(calls) == 1
+
+
+class TestProviderRetry:
+    """Test that providers share the retry policy."""
+
+    async def test_ollama_retries_rate_limit(self):
+        responses = [
+            httpx.Response(429, headers={"retry-after": "0"}),
+            httpx.Response(200, json={"response": "done"}),
+        ]
+        provider = OllamaProvider(ProviderConfig(api_key=""))
+        provider._build_http_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: responses.pop(0))
+        )
+        assert await provider.complete("hi") == "done"
+        assert not responses
+
+    async def test_stream_retries_before_first_chunk(self):
+        responses = [
+            httpx.Response(503, headers={"retry-after": "0"}),
+            httpx.Response(200, text='{"response": "ok", "done": true}\n'),
+        ]
+        provider = OllamaProvider(ProviderConfig(api_key=""))
+        provider._build_http_client = lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: responses.pop(0))
+        )
+        assert [chunk async for chunk in provider.stream("hi")] == ["ok"]
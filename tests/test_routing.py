@@ -0,0 +1,251 @@
+"""
+AILANG Tests - Routing provider tests.
+"""
+
+import asyncio
+
+import pytest
+
+from ailang.contracts import ContractError, OutputContract, enum, float_, int_
+from ailang.core import AILANG
+from ailang.retry import RetryPolicy
+from ailang.routing import (
+    CascadePolicy,
+    CascadeProvider,
+    HedgedProvider,
+    HedgePolicy,
+    Route,
+    RouterProvider,
+)
+from ailang.usage import ModelPrice, Usage
+from tests.fakes import FakeProvider
+
+
+def scripted(name: str, response: str = "", **kwargs) -> FakeProvider:
+    """Provider named ``name`` that answers ``response`` (its name by default)."""
+    return FakeProvider(
+        response or name, name=name, model=name, retry=RetryPolicy(max_retries=0), **kwargs
+    )
+
+
+class TestHedgedProvider:
+    """Test hedging and failover."""
+
+    async def test_fast_primary_wins_alone(self):
+        primary = scripted("primary")
+        backup = scripted("backup")
+        hedged = HedgedProvider(primary, backup, HedgePolicy(hedge_after=0.5))
+        assert await hedged.complete("hi") == "primary"
+        assert backup.calls == 0
+
+    async def test_slow_primary_is_hedged(self):
+        primary = scripted("primary", delay=1.0)
+        backup = scripted("backup")
+        hedged = HedgedProvider(primary, backup, HedgePolicy(hedge_after=0.01))
+        assert await hedged.complete("hi") == "backup"
+        await asyncio.sleep(0)
+        assert primary.cancelled == 1
+
+    async def test_failover_on_error(self):
+        primary = scripted("primary", error=RuntimeError("down"))
+        backup = scripted("backup")
+        hedged = HedgedProvider(primary, backup, HedgePolicy(hedge_after=10))
+        assert await hedged.complete("hi") == "backup"
+
+    async def test_contract_invalid_response_loses(self):
+        primary = scripted("primary", response="not json")
+        backup = scripted("backup", response='{"n": 1}', delay=0.01)
+        hedged = HedgedProvider(primary, backup, HedgePolicy(hedge_after=10))
+        contract = OutputContract({"n": int_()})
+        assert await hedged.complete("hi", contract) == '{"n": 1}'
+
+    async def test_all_fail_raises_last_error(self):
+        primary = scripted("primary", error=RuntimeError("primary down"))
+        backup = scripted("backup", error=RuntimeError("backup down"))
+        hedged = HedgedProvider(primary, backup)
+        with pytest.raises(RuntimeError, match="backup down"):
+            await hedged.complete("hi")
+
+    async def test_all_invalid_returns_last_response(self):
+        primary = scripted("primary", response="not json")
+        backup = scripted("backup", response="still not json", delay=0.01)
+        hedged = HedgedProvider(primary, backup, HedgePolicy(hedge_after=0.001))
+        assert await hedged.complete("hi", OutputContract({"n": int_()})) == "still not json"
+
+    async def test_ask_retries_after_invalid_responses(self):
+        primary = scripted("primary", response="not json")
+        backup = FakeProvider(["nope", '{"n": 2}'], name="backup")
+        ai = AILANG(provider=HedgedProvider(primary, backup, HedgePolicy(hedge_after=0.001)))
+        result = await ai.ask_async("count", returns={"n": int_()})
+        assert result.n == 2
+
+    async def test_hard_failover_skips_primary(self):
+        primary = scripted("primary", error=RuntimeError("down"))
+        backup = scripted("backup")
+        hedged = HedgedProvider(primary, backup, HedgePolicy(failover_after=2))
+        for _ in range(3):
+            await hedged.complete("hi")
+        assert primary.calls == 2
+        assert backup.calls == 3
+
+    def test_hedge_delay_uses_percentile(self):
+        hedged = HedgedProvider(
+            scripted("primary"),
+            scripted("backup"),
+            HedgePolicy(percentile=0.9, min_samples=10, hedge_after=5.0),
+        )
+        assert hedged.hedge_delay() == 5.0
+        hedged._latencies.extend(i / 10 for i in range(1, 11))
+        assert hedged.hedge_delay() == 0.9
+
+    def test_ailang_accepts_provider_instance(self):
+        hedged = HedgedProvider(scripted("primary"), scripted("backup"))
+        ai = AILANG(provider=hedged)
+        assert ai.provider is hedged
+        assert ai.run('write "x"') == "primary"
+
+
+class TestRouterProvider:
+    """Test latency- and cost-aware routing."""
+
+    async def test_prefers_faster_backend(self):
+        slow = scripted("slow", delay=0.02)
+        fast = scripted("fast")
+        router = RouterProvider({"slow": slow, "fast": fast})
+        for _ in range(5):
+            await router.complete("hi")
+        assert router.ranked()[0] == "fast"
+        assert fast.calls > slow.calls
+
+    async def test_prefers_cheaper_backend(self):
+        router = RouterProvider(
+            {
+                "pricey": Route(scripted("pricey"), cost_per_1k_tokens=0.05),
+                "cheap": Route(scripted("cheap"), cost_per_1k_tokens=0.001),
+            }
+        )
+        assert await router.complete("hi") == "cheap"
+
+    async def test_weight_divides_score(self):
+        router = RouterProvider(
+            {
+                "a": Route(scripted("a"), cost_per_1k_tokens=1.0),
+                "b": Route(scripted("b"), cost_per_1k_tokens=1.5, weight=2.0),
+            }
+        )
+        assert router.ranked() == ["b", "a"]
+
+    async def test_pins_by_action(self):
+        router = RouterProvider(
+            {"general": scripted("general"), "coder": scripted("coder")},
+            pins={"code": "coder", "summarize": ["general"]},
+        )
+        assert await router.complete("hi", action="code") == "coder"
+        assert await router.complete("hi", action="summarize") == "general"
+
+    async def test_errors_demote_and_fail_over(self):
+        broken = scripted("broken", error=RuntimeError("down"))
+        healthy = scripted("healthy", delay=0.001)
+        router = RouterProvider({"broken": Route(broken, weight=10), "healthy": Route(healthy)})
+        assert await router.complete("hi") == "healthy"
+        assert router.stats["broken"].error_rate > 0
+        await router.complete("hi")
+        assert broken.calls == 1
+
+    def test_rejects_unknown_pin(self):
+        with pytest.raises(ValueError):
+            RouterProvider({"a": scripted("a")}, pins={"code": "missing"})
+
+    def test_run_routes_by_action(self):
+        router = RouterProvider(
+            {"general": scripted("general"), "coder": scripted("coder")},
+            pins={"code": "coder"},
+        )
+        ai = AILANG(provider=router)
+        assert ai.run('code "sort" [python]') == "coder"
+
+
+class TestCascadeProvider:
+    """Test cheap-to-expensive escalation."""
+
+    async def test_valid_cheap_answer_stops(self):
+        cheap = scripted("cheap", '{"n": 1}')
+        strong = scripted("strong", '{"n": 2}')
+        cascade = CascadeProvider([cheap, strong])
+        assert await cascade.complete("hi", OutputContract({"n": int_()})) == '{"n": 1}'
+        assert strong.calls == 0
+        assert cascade.answered == [1, 0]
+
+    async def test_invalid_answer_escalates(self):
+        cheap = scripted("cheap", "not json")
+        strong = scripted("strong", '{"n": 2}')
+        cascade = CascadeProvider([cheap, strong])
+        result = await cascade.complete("hi", OutputContract({"n": int_()}))
+        assert result == '{"n": 2}'
+        assert result.provider == strong.name
+        assert cascade.answered == [0, 1]
+
+    async def test_low_confidence_escalates(self):
+        contract = OutputContract({"label": enum("yes", "no"), "confidence": float_()})
+        cheap = scripted("cheap", '{"label": "yes", "confidence": 0.4}')
+        strong = scripted("strong", '{"label": "no", "confidence": 0.9}')
+        cascade = CascadeProvider([cheap, strong], CascadePolicy(min_confidence=0.7))
+        assert "no" in await cascade.complete("hi", contract)
+
+    async def test_custom_accept(self):
+        cheap = scripted("cheap", '{"n": -1}')
+        strong = scripted("strong", '{"n": 5}')
+        cascade = CascadeProvider([cheap, strong], CascadePolicy(accept=lambda d: d["n"] >= 0))
+        assert await cascade.complete("hi", OutputContract({"n": int_()})) == '{"n": 5}'
+
+    async def test_errors_escalate(self):
+        cheap = scripted("cheap", error=ConnectionError("down"))
+        strong = scripted("strong")
+        assert await CascadeProvider([cheap, strong]).complete("hi") == "strong"
+
+    async def test_no_contract_uses_cheapest(self):
+        cheap = scripted("cheap")
+        strong = scripted("strong")
+        assert await CascadeProvider([cheap, strong]).complete("hi") == "cheap"
+        assert strong.calls == 0
+
+    async def test_ask_with_cascade(self):
+        cheap = scripted("cheap", "I think 3")
+        strong = scripted("strong", '{"n": 3}')
+        ai = AILANG(provider=CascadeProvider([cheap, strong]))
+        result = await ai.ask_async("count", returns={"n": int_()})
+        assert result.n == 3
+        assert cheap.calls == 1
+        assert strong.calls == 1
+
+    async def test_ledger_prices_each_tier(self):
+        usage = Usage(prompt_tokens=1000, completion_tokens=100)
+        cheap = scripted("cheap", "I think 3", usage=usage)
+        strong = scripted("strong", '{"n": 3}', usage=usage)
+        prices = {"cheap": ModelPrice(input=1.0, output=1.0), "strong": ModelPrice(10.0, 10.0)}
+        ai = AILANG(provider=CascadeProvider([cheap, strong]), prices=prices)
+        result = await ai.ask_async("count", returns={"n": int_()})
+        assert result._usage.total_tokens == 2200
+        assert ai.ledger.by_model["cheap"].usage.total_tokens == 1100
+        assert ai.ledger.by_model["strong"].usage.total_tokens == 1100
+        assert ai.ledger.total.cost == (1100 * 1.0 + 1100 * 10.0) / 1_000_000
+
+    async def test_strongest_answer_stands(self):
+        cheap = scripted("cheap", "bad")
+        strong = scripted("strong", "also bad")
+        ai = AILANG(provider=CascadeProvider([cheap, strong]))
+        with pytest.raises(ContractError):
+            await ai.ask_async("count", returns={"n": int_()})
+
+
+class TestWarmUp:
+    """Test warming up every backend of a routing provider."""
+
+    async def test_warms_all_backends(self):
+        primary = scripted("primary")
+        backup = scripted("backup")
+        await HedgedProvider(primary, backup).warm_up(probe=True)
+        await RouterProvider({"a": primary, "b": backup}).warm_up(probe=True)
+        await CascadeProvider([primary, backup]).warm_up(probe=True)
+        assert primary.calls == 3
+        assert backup.calls == 3
@@ -0,0 +1,73 @@
+"""
+AILANG Tests - REST API server tests.
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ailang.cli import main  # noqa: E402
+from ailang.providers import PROVIDERS  # noqa: E402
+from ailang.server import create_app  # noqa: E402
+from tests.fakes import FakeProvider  # noqa: E402
+
+
+class TestHealth:
+    """Test /health and startup warm-up."""
+
+    def test_ok_without_lifespan(self):
+        client = TestClient(create_app())
+        assert client.get("/health").json() == {"status": "ok"}
+
+    def test_unavailable_until_warm(self, monkeypatch):
+        monkeypatch.setitem(
+            PROVIDERS, "ollama", lambda config: FakeProvider(config=config, delay=0.3)
+        )
+        with TestClient(create_app(warm_up=["ollama"], probe=True)) as client:
+            response = client.get("/health")
+            assert response.status_code == 503
+            assert response.json() == {"status": "warming_up"}
+
+            for _ in range(50):
+                response = client.get("/health")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.05)
+            assert response.json() == {"status": "ok", "warm_up": {"ollama": "ok"}}
+
+
+class TestRun:
+    """Test the /run endpoint."""
+
+    def test_variable_named_like_parameter(self, monkeypatch):
+        monkeypatch.setitem(PROVIDERS, "ollama", lambda config: FakeProvider(config=config))
+        client = TestClient(create_app(default_provider="ollama"))
+        response = client.post(
+            "/run",
+            json={"command": "summarize {timeout}", "variables": {"timeout": "the meeting"}},
+        )
+        assert response.status_code == 200
+        assert "the meeting" in response.json()["result"]
+
+
+class TestServeCommand:
+    """Test the serve command."""
+
+    def test_warm_up_targets(self, monkeypatch):
+        served = []
+        monkeypatch.setitem(
+            sys.modules, "uvicorn", SimpleNamespace(run=lambda app, **kw: served.append(app))
+        )
+        result = CliRunner().invoke(main, ["serve", "-w", "ollama", "--warm-up", "ollama:llama3"])
+        assert result.exit_code == 0, result.output
+        assert len(served) == 1
+
+        client = TestClient(served[0])
+        assert client.get("/health").status_code == 503
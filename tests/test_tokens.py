@@ -0,0 +1,125 @@
+"""
+AILANG Tests - Token counting and budgeting tests.
+"""
+
+import pytest
+
+from ailang.contracts import OutputContract, code, enum, int_, list_, optional, str_
+from ailang.providers import (
+    AnthropicProvider,
+    GoogleProvider,
+    OllamaProvider,
+    OpenAIProvider,
+    Prompt,
+    PromptSegment,
+    ProviderConfig,
+)
+from ailang.tokens import (
+    PromptTooLongError,
+    count_tokens,
+    estimate_output_tokens,
+    model_context_window,
+    register_token_counter,
+    truncate_to_fit,
+)
+
+
+class TestCounting:
+    """Test local token counters."""
+
+    def test_heuristic_fallback(self):
+        assert count_tokens("x" * 400, "unknown") == 101
+
+    def test_registered_counter(self):
+        register_token_counter("test-family", lambda text, model: len(text.split()))
+        assert count_tokens("one two three", "test-family") == 3
+
+    def test_context_windows(self):
+        assert model_context_window("gpt-4o-mini") == 128_000
+        assert model_context_window("claude-opus-4.5") == 200_000
+        assert model_context_window("local-model") is None
+
+    def test_truncate_to_fit(self):
+        text = truncate_to_fit("word " * 1000, 100, lambda t: len(t) // 4 + 1)
+        assert len(text) // 4 + 1 <= 100
+        assert text.endswith("[...truncated]")
+
+
+class TestOutputEstimate:
+    """Test max_tokens sizing from contracts."""
+
+    def test_bounded_contract(self):
+        contract = OutputContract(
+            {
+                "label": enum("positive", "negative"),
+                "score": int_(),
+                "tags": list_(str_(max=20), max=5),
+                "note": optional(str_(max=100)),
+            }
+        )
+        estimate = estimate_output_tokens(contract)
+        assert 100 < estimate < 400
+
+    def test_unbounded_contract(self):
+        assert estimate_output_tokens(OutputContract({"text": str_()})) is None
+        assert estimate_output_tokens(OutputContract({"fix": code("python")})) is None
+        assert estimate_output_tokens(OutputContract({"items": list_(int_())})) is None
+
+
+class TestBudgeting:
+    """Test per-call max_tokens and context window checks."""
+
+    def test_contract_shrinks_max_tokens(self):
+        config = ProviderConfig(api_key="test", model="gpt-4.1", contract_max_tokens=True)
+        provider = OpenAIProvider(config)
+        contract = OutputContract({"label": enum("yes", "no")})
+        assert provider._chat_params("hi", contract)["max_tokens"] < 100
+        assert provider._chat_params("hi")["max_tokens"] == 2000
+
+        default = OpenAIProvider(ProviderConfig(api_key="test", model="gpt-4.1"))
+        assert default._chat_params("hi", contract)["max_tokens"] == 2000
+
+    def test_reasoning_models_keep_full_budget(self):
+        contract = OutputContract({"label": enum("yes", "no")})
+        for model in ("gpt-5.2", "o3-mini"):
+            config = ProviderConfig(api_key="test", model=model, contract_max_tokens=True)
+            assert OpenAIProvider(config)._chat_params("hi", contract)["max_tokens"] == 2000
+        config = ProviderConfig(api_key="key", model="gemini-2.5-flash", contract_max_tokens=True)
+        body = GoogleProvider(config)._request_body("hi", contract)
+        assert body["generationConfig"]["maxOutputTokens"] == 2000
+
+    def test_ollama_num_predict(self):
+        contract = OutputContract({"label": enum("yes", "no")})
+        provider = OllamaProvider(ProviderConfig(api_key="", contract_max_tokens=True))
+        assert provider._generate_body("hi", False, contract)["options"]["num_predict"] < 100
+        assert "options" not in provider._generate_body("hi", False)
+        assert "options" not in OllamaProvider(ProviderConfig(api_key=""))._generate_body(
+            "hi", False, contract
+        )
+
+    def test_max_tokens_limited_by_room(self):
+        provider = AnthropicProvider(ProviderConfig(api_key="test", context_window=1000))
+        params = provider._message_params("x" * 2800)
+        assert params["max_tokens"] == 1000 - provider.count_tokens("x" * 2800)
+
+    def test_rejects_oversized_prompt(self):
+        provider = OllamaProvider(ProviderConfig(api_key="", num_ctx=1000))
+        with pytest.raises(PromptTooLongError):
+            provider.preflight("x" * 4000)
+        assert provider.preflight("short") == "short"
+
+    def test_truncates_largest_user_segment(self):
+        provider = OllamaProvider(
+            ProviderConfig(api_key="", num_ctx=600, max_tokens=100, truncate_prompts=True)
+        )
+        prompt = Prompt(
+            [
+                PromptSegment("Be brief.", role="system"),
+                PromptSegment("doc: " + "x" * 4000, cacheable=True),
+                PromptSegment("what is this?"),
+            ]
+        )
+        truncated = provider.preflight(prompt)
+        assert provider.count_tokens(truncated) <= 500
+        assert truncated.startswith("Be brief.")
+        assert truncated.endswith("what is this?")
@@ -0,0 +1,67 @@
+"""
+AILANG Tests - Usage accounting tests.
+"""
+
+from ailang.contracts import str_
+from ailang.core import AILANG
+from ailang.usage import Ledger, ModelPrice, Usage
+from tests.fakes import FakeProvider
+
+
+def metered(responses: list[str]) -> FakeProvider:
+    """Provider that answers ``responses`` in turn, each with fixed token counts."""
+    return FakeProvider(
+        responses, name="metered", usage=Usage(prompt_tokens=100, completion_tokens=10)
+    )
+
+
+class TestModelPrice:
+    """Test cost estimates."""
+
+    def test_cost(self):
+        price = ModelPrice(input=2.0, output=10.0, cached_input=0.5)
+        usage = Usage(prompt_tokens=1_000_000, completion_tokens=100_000, cached_tokens=500_000)
+        assert price.cost(usage) == 1.0 + 0.25 + 1.0
+
+    def test_prefix_match(self):
+        ledger = Ledger({"gpt-5": ModelPrice(1, 1), "gpt-5.2": ModelPrice(2, 2)})
+        assert ledger.price_for("gpt-5.2-2025-12-11").input == 2
+        assert ledger.price_for("gpt-5-mini").input == 1
+        assert ledger.price_for("claude") is None
+
+
+class TestLedger:
+    """Test per-call usage on results and the AILANG ledger."""
+
+    async def test_run_returns_completion(self):
+        ai = AILANG(provider=metered(["hello"]))
+        result = await ai.run_async('write "haiku"')
+        assert result == "hello"
+        assert result.usage.total_tokens == 110
+        assert result.model == "test-model"
+        assert result.provider == "metered"
+        assert result.latency >= 0
+
+    async def test_ledger_by_action_and_model(self):
+        ai = AILANG(
+            provider=metered(["a", "b", '{"x": "y"}']),
+            prices={"test-model": ModelPrice(input=1.0, output=2.0)},
+        )
+        await ai.run_async('write "haiku"')
+        await ai.run_async('code "sort"')
+        await ai.ask_async("q", returns={"x": str_()})
+
+        ledger = ai.ledger
+        assert ledger.total.calls == 3
+        assert ledger.total.usage.prompt_tokens == 300
+        assert ledger.by_action["write"].calls == 1
+        assert ledger.by_action["ask"].usage.completion_tokens == 10
+        assert ledger.by_model["test-model"].calls == 3
+        assert ledger.total.cost == 3 * (100 * 1.0 + 10 * 2.0) / 1_000_000
+
+    async def test_contract_result_counts_retry(self):
+        ai = AILANG(provider=metered(["not json", '{"x": "y"}']))
+        result = await ai.ask_async("q", returns={"x": str_()})
+        assert result.x == "y"
+        assert result._usage.prompt_tokens == 200
+        assert result._raw.provider == "metered"